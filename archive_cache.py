@@ -0,0 +1,173 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import zipfile
+from dataclasses import asdict
+from urllib.parse import urlsplit
+
+from remote_zip import MemberLocation, RemoteZipError
+
+INDEX_NAME = "index.json"
+ARCHIVE_NAME = "archive.zip"
+MEMBERS_DIR = "members"
+
+
+def archive_key(url: str, etag: str | None, size: int | None) -> str | None:
+    """Content address for an archive: resolved URL plus ETag / Content-Length.
+
+    The query string is dropped because download hosts sign their URLs per
+    request; without an ETag or a size there is nothing to validate against,
+    so such archives are not cached.
+    """
+    if not etag and size is None:
+        return None
+    parts = urlsplit(url)
+    identity = f"{parts.scheme}://{parts.netloc}{parts.path}\n{etag or ''}\n{size if size is not None else ''}"
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+def build_index(zip_ref: zipfile.ZipFile) -> dict:
+    return {
+        'members': zip_ref.namelist(),
+        'lua': {
+            info.filename: asdict(MemberLocation.from_zipinfo(info))
+            for info in zip_ref.infolist() if info.filename.endswith('.lua')
+        },
+    }
+
+
+class ArchiveCache:
+    """Size-capped on-disk cache of manifest archives, one directory per archive key.
+
+    Each directory holds the member index (names plus .lua member locations),
+    any .lua files already extracted and, when a host forced a full download,
+    the archive itself. Directory mtimes track recency for LRU eviction.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.RLock()
+        self._sizes = {key: self._disk_usage(key) for key in os.listdir(root)
+                       if os.path.isdir(os.path.join(root, key))}
+
+    def _path(self, key: str, *parts: str) -> str:
+        return os.path.join(self.root, key, *parts)
+
+    def _disk_usage(self, key: str) -> int:
+        total = 0
+        for directory, _, files in os.walk(self._path(key)):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return total
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._sizes.pop(key, None)
+
+    def _write(self, key: str, relative_path: str, data: bytes):
+        path = self._path(key, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so a crash never leaves a half-written entry behind; the pid keeps
+        # processes sharing the cache directory from writing the same temp file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+            self._sizes[key] = self._sizes.get(key, 0) + len(data) - replaced
+            self._touch(key)
+            self._evict(keep=key)
+
+    def _mtime(self, key: str) -> float:
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return 0.0
+
+    def _evict(self, keep: str):
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age = sorted(self._sizes, key=self._mtime)
+        for key in by_age:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def get_index(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key, INDEX_NAME), encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key)
+        return index
+
+    def put_index(self, key: str, index: dict):
+        self._write(key, INDEX_NAME, json.dumps(index).encode())
+
+    def get_member(self, key: str, name: str) -> io.BytesIO | None:
+        path = self._path(key, MEMBERS_DIR, hashlib.sha1(name.encode()).hexdigest())
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._touch(key)
+        return io.BytesIO(data)
+
+    def put_member(self, key: str, name: str, data: bytes):
+        self._write(key, os.path.join(MEMBERS_DIR, hashlib.sha1(name.encode()).hexdigest()), data)
+
+    def open_archive(self, key: str) -> zipfile.ZipFile | None:
+        """Open a cached full archive; zipfile seeks straight to the member it needs."""
+        try:
+            zip_ref = zipfile.ZipFile(self._path(key, ARCHIVE_NAME))
+        except FileNotFoundError:
+            return None
+        self._touch(key)
+        return zip_ref
+
+    def read_archive_member(self, key: str, name: str, max_size: int) -> bytes | None:
+        """Inflate one member of a cached full archive; blocking, so callers run it on a worker."""
+        zip_ref = self.open_archive(key)
+        if zip_ref is None:
+            return None
+        with zip_ref:
+            info = zip_ref.getinfo(name)
+            if info.file_size > max_size:
+                raise RemoteZipError(f"{name} is {info.file_size} bytes, limit is {max_size}")
+            return zip_ref.read(info)
+
+    def put_archive(self, key: str, data: bytes):
+        if len(data) <= self.max_bytes:
+            self._write(key, ARCHIVE_NAME, data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = len(self._sizes), sum(self._sizes.values())
+        return {
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -1,184 +1,130 @@
 import nextcord
-from nextcord.ext import commands
-import requests
-import re
+import asyncio
+import functools
 import os
-import threading
-from flask import Flask 
-import datetime
+import time
 import zipfile
 import io
-import tempfile
-
-# --- 1. Flask Keep-Alive Setup ---
-web_app = Flask('') 
-
-@web_app.route('/')
-def home():
-    return "Discord Bot is running and ready to serve!"
-
-def run_web_server():
-    port = int(os.environ.get("PORT", 8080))
-    web_app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
-
-def keep_alive():
-    t = threading.Thread(target=run_web_server)
-    t.start()
-    
-# --- 2. Configuration & API Endpoints ---
-DISCORD_BOT_TOKEN = os.environ.get("DISCORD_BOT_TOKEN", "YOUR_BOT_TOKEN_HERE") 
-ALLOWED_CHANNEL_IDS = [1098314625646329966, 1422199765818413116]
-DEVGOD_BASE_URL = "https://devg0d.pythonanywhere.com/app_request/"
+from http_client import http, HTTP_ERRORS, ProbeResult
+from cache import RequestCoalescer, MISSING
+from periodic import PeriodicTask
+from catalog import GameCatalog, parse_games_listing
+from tracing import traced
+from parsing import loads_in_pieces
+from pipeline import Lookup, PENDING
+from remote_zip import open_remote_zip, read_member, is_partial, MemberLocation, RemoteZipError, MAX_MEMBER_SIZE
+from archive_cache import ArchiveCache, archive_key, build_index
+from core import (bot, workers, shared_cache, upstream_breakers, health_server, pipeline, steam_lookup, run,
+                  probe_file, peek_file_probe, add_steam_fields, parse_numeric_app_id,
+                  file_gates, probe_warmers, app_name_sources, dlc_notes, refreshers,
+                  FILE_SERVER_HOST, FILE_SERVER_DOWN_NOTE, PRIMARY_PROCESS)
+
+# Adds the Morrenus catalog, the archive cache and the commands built on them to core's bot
+
+# --- 1. Configuration & API Endpoints ---
 STEAMCMD_API_URL = "https://api.steamcmd.net/v1/info/"
-STEAM_APP_DETAILS_URL = "https://store.steampowered.com/api/appdetails?appids="
-MORRENUS_GAMES_URL = "https://manifest.morrenus.xyz/api/games?t=0"
-
-# Intents
-intents = nextcord.Intents.default()
-intents.messages = True
-intents.message_content = True
-intents.guilds = True
-intents.members = True
-
-bot = commands.Bot(command_prefix="/", intents=intents)
-
-# --- 3. Helper Functions ---
-def extract_app_id(message_content):
-    if message_content.isdigit():
-        return message_content
-    match = re.search(r'(?:steamdb\.info\/app\/|store\.steampowered\.com\/app\/)(\d+)', message_content)
-    if match:
-        return match.group(1)
-    return None
-
-def fetch_release_date_from_store_data(store_data: dict) -> str:
-    en_to_th = {
-        "Jan": "มกราคม", "Feb": "กุมภาพันธ์", "Mar": "มีนาคม", "Apr": "เมษายน",
-        "May": "พฤษภาคม", "Jun": "มิถุนายน", "Jul": "กรกฎาคม", "Aug": "สิงหาคม",
-        "Sep": "กันยายน", "Oct": "ตุลาคม", "Nov": "พฤศจิกายน", "Dec": "ธันวาคม"
-    }
-
-    th_short_to_full = {
-        "ม.ค.": "มกราคม", "ก.พ.": "กุมภาพันธ์", "มี.ค.": "มีนาคม", "เม.ย.": "เมษายน",
-        "พ.ค.": "พฤษภาคม", "มิ.ย.": "มิถุนายน", "ก.ค.": "กรกฎาคม", "ส.ค.": "สิงหาคม",
-        "ก.ย.": "กันยายน", "ต.ค.": "ตุลาคม", "พ.ย.": "พฤศจิกายน", "ธ.ค.": "ธันวาคม"
-    }
-
-    raw_date = store_data.get('release_date', {}).get('date', 'ไม่ระบุ')
-    if raw_date == 'ไม่ระบุ' or raw_date.lower() == 'tba':
-        return 'ไม่ระบุ'
-
-    for short, full in th_short_to_full.items():
-        if short in raw_date:
-            return raw_date.replace(short, full)
-
-    try:
-        dt = datetime.datetime.strptime(raw_date, "%b %d, %Y")
-        return f"{dt.day} {en_to_th[dt.strftime('%b')]} {dt.year}"
-    except ValueError:
-        try:
-            dt = datetime.datetime.strptime(raw_date, "%Y-%m-%d")
-            return f"{dt.day} {en_to_th[dt.strftime('%b')]} {dt.year}"
-        except ValueError:
-            pass
-
-    for eng_month, th_month in en_to_th.items():
-        if eng_month in raw_date:
-            return raw_date.replace(eng_month, th_month)
-    return raw_date
-
-def get_steam_info(app_id):
-    release_date_thai = 'ไม่ระบุ'
-    has_denuvo = False
-    header_image_store = None
-    name_store = 'ไม่พบแอป'
-    dlc_count_store = 0
-    store_success = False
-    drm_notice = ""
-
-    try:
-        store_url = f"{STEAM_APP_DETAILS_URL}{app_id}&cc=th&l=th"
-        store_resp = requests.get(store_url, timeout=5)
-        store_resp.raise_for_status()
-        store_data = store_resp.json()
-        if store_data and store_data.get(app_id, {}).get("success") is True:
-            store_info = store_data[app_id].get("data", {})
-            store_success = True
-            name_store = store_info.get("name", 'ไม่พบแอป')
-            header_image_store = store_info.get("header_image")
-            dlc_list = store_info.get("dlc", [])
-            dlc_count_store = len(dlc_list)
-            release_date_thai = fetch_release_date_from_store_data(store_info)
-            drm_notice = store_info.get("drm_notice", "")
-            has_denuvo = "denuvo" in drm_notice.lower()
-    except requests.RequestException as e:
-        print(f"Steam Store fetch error: {e}")
-
-    return {
-        'name': name_store,
-        'developer': store_info.get('developer', 'ไม่ระบุ') if store_success else 'ไม่ระบุ',
-        'image': header_image_store,
-        'dlc_count': dlc_count_store,
-        'release_date': release_date_thai,
-        'has_denuvo': has_denuvo,
-    }
-
-def check_file_status(app_id: str) -> str | None:
-    url = f"{DEVGOD_BASE_URL}{app_id}"
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-        final_url = response.url
-        if response.status_code == 200 and "content-disposition" in response.headers:
-            return final_url
-    except requests.RequestException:
-        return None
-    return None
-
-def download_and_extract_lua(app_id: str) -> tuple[str | None, str | None]:
-    final_url = check_file_status(app_id)
-    if not final_url:
+MORRENUS_GAMES_URL = os.environ.get("MORRENUS_GAMES_URL", "https://manifest.morrenus.xyz/api/games?t=0")
+MORRENUS_STATUS_URL = os.environ.get("MORRENUS_STATUS_URL", "https://manifest.morrenus.xyz")
+ARCHIVE_CACHE_DIR = os.environ.get("ARCHIVE_CACHE_DIR", os.path.join(".cache", "archives"))
+ARCHIVE_CACHE_MAX_BYTES = int(os.environ.get("ARCHIVE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+MORRENUS_REFRESH_INTERVAL = float(os.environ.get("MORRENUS_REFRESH_INTERVAL", 300))
+# How long a persisted Morrenus snapshot may stand in for /info after a restart
+MORRENUS_SNAPSHOT_MAX_AGE = float(os.environ.get("MORRENUS_SNAPSHOT_MAX_AGE", 7 * 24 * 3600))
+CATALOG_PATH = os.environ.get("CATALOG_PATH", os.path.join(".cache", "catalog.sqlite3"))
+# When on, apps missing from a loaded catalog are reported as "no file" without probing
+# Off by default: a partial or reshaped listing would answer "no file" for apps that have one.
+# Even when enabled, apps are only ruled out while the catalog matches the listing's totals
+CATALOG_GATES_FILE_STATUS = os.environ.get("CATALOG_GATES_FILE_STATUS", "0") == "1"
+
+# ZIP indexes, extracted .lua files and fully downloaded archives, keyed by URL + ETag/size
+archive_cache = ArchiveCache(ARCHIVE_CACHE_DIR, ARCHIVE_CACHE_MAX_BYTES)
+# local copy of the Morrenus game list, synced by the Morrenus snapshot refresher
+game_catalog = GameCatalog(CATALOG_PATH)
+
+# --- 2. Helper Functions ---
+@traced("archive_index")
+async def load_zip_index(probe: ProbeResult, key: str | None) -> dict:
+    index = archive_cache.get_index(key) if key else None
+    if index is not None:
+        return index
+
+    zip_ref = await open_remote_zip(http, probe.url, probe.size, timeout=15, pool=workers,
+                                    ranges=probe.accept_ranges)
+    return await workers.run(index_archive, zip_ref, key)
+
+def index_archive(zip_ref: zipfile.ZipFile, key: str | None) -> dict:
+    """Index an opened archive and cache it; blocking, so load_zip_index runs it on a worker."""
+    with zip_ref:
+        index = build_index(zip_ref)
+        if key:
+            archive_cache.put_index(key, index)
+            if not is_partial(zip_ref):
+                # The host ignored Range and sent everything; keep it for member reads
+                zip_ref.fp.seek(0)
+                archive_cache.put_archive(key, zip_ref.fp.read())
+    return index
+
+@traced("extract")
+async def read_lua_member(probe: ProbeResult, key: str | None, member: MemberLocation) -> io.BytesIO:
+    data = await workers.run(archive_cache.read_archive_member, key, member.name, MAX_MEMBER_SIZE) if key else None
+    if data is not None:
+        return io.BytesIO(data)
+    return await read_member(http, probe.url, member, probe.size, timeout=15, pool=workers)
+
+async def download_and_extract_lua(app_id: str) -> tuple[str | None, io.BytesIO | None]:
+    probe = await probe_file(app_id)
+    if not probe:
         return None, None
+    key = archive_key(probe.url, probe.etag, probe.size)
 
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(final_url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        with io.BytesIO(response.content) as zip_buffer:
-            with zipfile.ZipFile(zip_buffer, 'r') as zip_ref:
-                lua_file = next((f for f in zip_ref.namelist() if f.endswith('.lua')), None)
-                if lua_file:
-                    with zip_ref.open(lua_file) as lua_content:
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.lua') as temp_file:
-                            temp_file.write(lua_content.read())
-                            temp_file_path = temp_file.name
-                    return lua_file, temp_file_path
-        return None, None
-    except (requests.RequestException, zipfile.BadZipFile) as e:
+        index = await load_zip_index(probe, key)
+        lua_file = next((f for f in index['members'] if f.endswith('.lua')), None)
+        if not lua_file:
+            return None, None
+
+        lua_buffer = archive_cache.get_member(key, lua_file) if key else None
+        if lua_buffer is None:
+            lua_buffer = await read_lua_member(probe, key, MemberLocation(**index['lua'][lua_file]))
+            if key:
+                archive_cache.put_member(key, lua_file, lua_buffer.getvalue())
+        return lua_file, lua_buffer
+    except (*HTTP_ERRORS, zipfile.BadZipFile, RemoteZipError) as e:
         print(f"Error downloading or extracting ZIP: {e}")
         return None, None
 
-def list_files_in_zip(app_id: str) -> list[str] | None:
-    final_url = check_file_status(app_id)
-    if not final_url:
+async def list_files_in_zip(app_id: str) -> list[str] | None:
+    probe = await probe_file(app_id)
+    if not probe:
         return None
 
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(final_url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        with io.BytesIO(response.content) as zip_buffer:
-            with zipfile.ZipFile(zip_buffer, 'r') as zip_ref:
-                return zip_ref.namelist()
-        return None
-    except (requests.RequestException, zipfile.BadZipFile) as e:
+        # Served from the archive cache, else only the central directory is fetched
+        index = await load_zip_index(probe, archive_key(probe.url, probe.etag, probe.size))
+        return index['members']
+    except (*HTTP_ERRORS, zipfile.BadZipFile, RemoteZipError) as e:
         print(f"Error downloading or listing files in ZIP: {e}")
         return None
 
-def fetch_morrenus_database():
+async def refreshed_file_list(app_id: str, refresh: asyncio.Task) -> list[str] | None:
+    await refresh
+    return await list_files_in_zip(app_id)
+
+def peek_file_list(app_id: str) -> tuple[list[str] | None, asyncio.Task | None]:
+    """list_files_in_zip() from the file-status and archive caches only; MISSING if either lacks it."""
+    probe, refresh = peek_file_probe(app_id)
+    if probe is MISSING:
+        return MISSING, None
+    file_list = None
+    if probe:
+        key = archive_key(probe.url, probe.etag, probe.size)
+        index = archive_cache.get_index(key) if key else None
+        if index is None:
+            return MISSING, None
+        file_list = index['members']
+    return file_list, refresh and asyncio.ensure_future(refreshed_file_list(app_id, refresh))
+
+async def fetch_morrenus_database(validators: dict | None = None):
     url = MORRENUS_GAMES_URL
     headers = {
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -193,226 +139,166 @@ def fetch_morrenus_database():
         'Sec-Fetch-User': '?1',
         'Upgrade-Insecure-Requests': '1',
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
-        'Cookie': os.environ.get("MORRENUS_COOKIE", "")
+        'Cookie': os.environ.get("MORRENUS_COOKIE", ""),
+        **(validators or {}),
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = await http.get(url, headers=headers, timeout=10)
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        return response
+    except HTTP_ERRORS as e:
         print(f"Morrenus games fetch error: {e}")
         return None
 
-def check_morrenus_status():
-    url = "https://manifest.morrenus.xyz"
+async def check_morrenus_status():
+    url = MORRENUS_STATUS_URL
     try:
-        response = requests.get(url, timeout=5)
-        return response.status_code == 200
-    except requests.RequestException:
+        response = await http.get(url, timeout=5)
+        return response.status == 200
+    except HTTP_ERRORS:
         return False
 
-def convert_download_url(url: str) -> tuple[str | None, str | None, str | None, str | None]:
-    """แปลง URL จาก gofile หรือ pixeldrain เป็น URL ใหม่ พร้อมคืน file_id และ flag"""
-    gofile_match = re.match(r"https://gofile\.io/d/([a-zA-Z0-9]+)", url)
-    if gofile_match:
-        file_id = gofile_match.group(1)
-        return f"https://gf.1drv.eu.org/{file_id}", url, file_id, "🇬"
-    pixeldrain_match = re.match(r"https://pixeldrain\.com/u/([a-zA-Z0-9]+)", url)
-    if pixeldrain_match:
-        file_id = pixeldrain_match.group(1)
-        return f"https://pd.1drv.eu.org/{file_id}", url, file_id, "🇵"
-    return None, None, None, None
-
-# --- 5. Slash Commands ---
-@bot.slash_command(name="gen", description="ค้นหาไฟล์จาก App ID หรือ URL")
-async def gen(interaction: nextcord.Interaction, input_value: str = nextcord.SlashOption(
-    name="input",
-    description="ใส่ App ID หรือ URL (เช่น 730 หรือ https://store.steampowered.com/app/730/)",
-    required=True
-)):
-    if interaction.channel_id not in ALLOWED_CHANNEL_IDS:
-        await interaction.response.send_message("ไม่มีสิทธิในการใช้งาน กรุณาใช้คำสั่งที่ <#1422199765818413116>", ephemeral=True)
-        return
-
-    app_id = extract_app_id(input_value)
-    if not app_id:
-        await interaction.response.send_message("ไม่พบ App ID ในข้อมูลที่ให้มา!", ephemeral=True)
-        return
-
-    await interaction.response.defer()
-    steam_data = get_steam_info(app_id)
-    file_url_200 = check_file_status(app_id) 
-    
-    embed = nextcord.Embed(
-        title=f"🔎 ข้อมูล Steam App ID: {app_id}",
-        color=0x00FF00 if file_url_200 else 0xFF0000
-    )
-    
-    if steam_data:
-        embed.add_field(name="ชื่อแอป", value=steam_data['name'], inline=False)
-        if steam_data['developer'] != 'ไม่ระบุ':
-            embed.add_field(name="ผู้พัฒนา", value=steam_data['developer'], inline=False)
-        if steam_data['dlc_count'] > 0:
-            embed.add_field(
-                name="",
-                value=f"📦 สถานะ DLC: ✅ พบ DLC\n(ไม่ทราบจำนวนDLCที่พบและสูญหาย)",
-                inline=False
-            )
-        else:
-            embed.add_field(
-                name="",
-                value="📦 สถานะ DLC: ℹ️ ไม่พบ DLC",
-                inline=False
-            )
-        embed.add_field(name="วันวางจำหน่าย", value=steam_data['release_date'], inline=False)
-        links_value = f"[Steam Store](https://store.steampowered.com/app/{app_id}/) | [SteamDB](https://steamdb.info/app/{app_id}/)"
-        if steam_data['has_denuvo']:
-            links_value += "\n:warning: ตรวจพบการป้องกัน Denuvo"
-        embed.add_field(name="Links", value=links_value, inline=False)
-        
-        if steam_data['image']:
-            embed.set_image(url=steam_data['image'])
-            embed.set_footer(text="Discord • DEV/g0d • Solus")
-    else:
-        embed.add_field(name="สถานะ Steam", value="ไม่พบข้อมูลเกมบน Steam", inline=False)
-        embed.set_footer(text="Discord • DEV/g0d • Solus")
-        
-    if file_url_200:
-        embed.add_field(
-            name="", 
-            value=f"**📥 สถานะไฟล์:** ✅ [**พร้อมดาวน์โหลด↗**]({file_url_200})", 
-            inline=False
-        )
-    else:
-        embed.add_field(
-            name="📥 สถานะไฟล์: ❌ ไม่พบไฟล์", 
-            value="", 
-            inline=False
-        )
-    
-    await interaction.followup.send(embed=embed)
-
-@bot.slash_command(name="check_lua", description="ดึงไฟล์ .lua จาก App ID")
-async def check_lua(interaction: nextcord.Interaction, app_id: str = nextcord.SlashOption(
-    name="appid",
-    description="ใส่ App ID (เช่น 2947440)",
-    required=True
-)):
-    if interaction.channel_id not in ALLOWED_CHANNEL_IDS:
-        await interaction.response.send_message("ไม่มีสิทธิในการใช้งาน กรุณาใช้คำสั่งที่ <#1422199765818413116>", ephemeral=True)
+def parse_morrenus_body(body: bytes) -> tuple[dict | None, list]:
+    """Counters for /info and catalog rows from the games listing; runs on a worker, decoded in pieces."""
+    data = loads_in_pieces(body)
+    if not isinstance(data, dict):
+        return None, []
+    counters = {key: data[key] for key in ('total', 'total_dlc') if key in data}
+    return counters, parse_games_listing(data)
+
+async def restore_morrenus_snapshot():
+    """Pick up the snapshot persisted by the previous run so /info can answer before the first refresh."""
+    if shared_cache is None or morrenus_snapshot['checked_at'] is not None:
         return
-
-    if not app_id.isdigit():
-        await interaction.response.send_message("App ID ต้องเป็นตัวเลขเท่านั้น!", ephemeral=True)
+    row = await workers.run(shared_cache.get, "morrenus", "snapshot")
+    if row is None or morrenus_snapshot['checked_at'] is not None:
         return
+    snapshot = row[0]
+    if not len(game_catalog):
+        # A 304 would leave the (missing) catalog unfilled; fetch the listing in full
+        snapshot.update(etag=None, last_modified=None)
+    morrenus_snapshot.update(snapshot)
+    update_catalog_complete()
+
+async def refresh_morrenus_snapshot():
+    await restore_morrenus_snapshot()
+    validators = {}
+    if morrenus_snapshot['etag']:
+        validators['If-None-Match'] = morrenus_snapshot['etag']
+    if morrenus_snapshot['last_modified']:
+        validators['If-Modified-Since'] = morrenus_snapshot['last_modified']
+
+    response = await fetch_morrenus_database(validators)
+    if response is not None and response.status == 200:
+        try:
+            counters, catalog_rows = await workers.run(parse_morrenus_body, response.body)
+        except ValueError as e:
+            print(f"Morrenus games parse error: {e}")
+            counters = None
+        if counters is not None:
+            # Only the counters are kept; the full listing is not needed for /info
+            morrenus_snapshot['data'] = counters
+            # An empty parse means the listing changed shape; keep the old catalog rather than wipe it
+            if catalog_rows:
+                # Diffing and writing ~100k rows would stall the gateway loop; do it on a worker
+                added, updated, removed = await workers.run(game_catalog.sync, catalog_rows)
+                if added or updated or removed:
+                    print(f"Catalog synced: +{added} ~{updated} -{removed} ({len(game_catalog)} apps)")
+            update_catalog_complete()
+            morrenus_snapshot['etag'] = response.headers.get('ETag')
+            morrenus_snapshot['last_modified'] = response.headers.get('Last-Modified')
+
+    # An answered games request (200 or 304) already proves the site is up
+    morrenus_snapshot['online'] = response is not None or await check_morrenus_status()
+    morrenus_snapshot['checked_at'] = time.time()
+    if shared_cache is not None:
+        shared_cache.set("morrenus", "snapshot", morrenus_snapshot, MORRENUS_SNAPSHOT_MAX_AGE)
+
+async def follow_morrenus_snapshot():
+    """Shard processes other than the primary take the snapshot and catalog it keeps in sync."""
+    row = await workers.run(shared_cache.get, "morrenus", "snapshot")
+    if row is not None:
+        morrenus_snapshot.update(row[0])
+    await workers.run(game_catalog.reload_totals)
+    update_catalog_complete()
+
+async def warm_zip_index(probe: ProbeResult):
+    await load_zip_index(probe, archive_key(probe.url, probe.etag, probe.size))
+
+def update_catalog_complete():
+    global catalog_complete
+    catalog_complete = CATALOG_GATES_FILE_STATUS and game_catalog.matches(morrenus_snapshot['data'])
+
+def catalog_rules_out(app_id: str) -> bool:
+    return catalog_complete and not game_catalog.contains(app_id)
+
+# /info answers from this snapshot; the refresher revalidates it with ETag / If-Modified-Since
+morrenus_snapshot = {'data': None, 'online': False, 'checked_at': None, 'etag': None, 'last_modified': None}
+# Whether catalog_rules_out may answer "no file"; set once the catalog is known to match the listing
+catalog_complete = False
+# Only the primary process fetches the listing and writes the catalog file; with several shard
+# processes the others follow it through the shared cache instead of syncing the same file at once
+update_morrenus_snapshot = (refresh_morrenus_snapshot if PRIMARY_PROCESS or shared_cache is None
+                            else follow_morrenus_snapshot)
+morrenus_refresher = PeriodicTask(update_morrenus_snapshot, MORRENUS_REFRESH_INTERVAL, "Morrenus snapshot")
+morrenus_requests = RequestCoalescer()
+
+# --- 3. Embed Builders ---
+def dlc_catalog_note(app_id: str, dlc_count: int) -> str | None:
+    catalog_dlc = len(game_catalog.dlc_of(app_id))
+    if catalog_dlc:
+        return f"(มี {catalog_dlc}/{dlc_count} DLC ในฐานข้อมูล)"
+    return None
 
-    await interaction.response.defer()
-
-    steam_data = get_steam_info(app_id)
-    lua_file_name, lua_file_path = download_and_extract_lua(app_id)
-
+def build_lua_embed(app_id: str, steam_data, lua_result) -> nextcord.Embed:
+    lua_pending = lua_result is PENDING
+    lua_file_name, lua_buffer = (None, None) if lua_pending else lua_result
     embed = nextcord.Embed(
         title=f"🔎 ผลการค้นหาไฟล์ .lua สำหรับ App ID: {app_id}",
-        color=0x00FF00 if lua_file_path else 0xFF0000
+        color=0xAAAAAA if lua_pending else 0x00FF00 if lua_buffer else 0xFF0000
     )
 
-    if steam_data:
-        embed.add_field(name="ชื่อแอป", value=steam_data['name'], inline=False)
-        if steam_data['developer'] != 'ไม่ระบุ':
-            embed.add_field(name="ผู้พัฒนา", value=steam_data['developer'], inline=False)
-        if steam_data['dlc_count'] > 0:
-            embed.add_field(
-                name="",
-                value=f"📦 สถานะ DLC: ✅ พบ DLC\n(ไม่ทราบจำนวนDLCที่พบและสูญหาย)",
-                inline=False
-            )
-        else:
-            embed.add_field(
-                name="",
-                value="📦 สถานะ DLC: ℹ️ ไม่พบ DLC",
-                inline=False
-            )
-        
-        if steam_data['image']:
-            embed.set_image(url=steam_data['image'])
-            embed.set_footer(text="Discord • DEV/g0d • Solus")
-    else:
-        embed.add_field(name="สถานะ Steam", value="ไม่พบข้อมูลเกมบน Steam", inline=False)
-        embed.set_footer(text="Discord • DEV/g0d • Solus")
+    add_steam_fields(embed, app_id, steam_data)
 
-    if lua_file_path and lua_file_name:
+    if lua_pending:
+        embed.add_field(name="📄 สถานะไฟล์ .lua", value="⏳ กำลังดาวน์โหลดและแตกไฟล์...", inline=False)
+    elif lua_buffer and lua_file_name:
         embed.add_field(
             name="📄 สถานะไฟล์ .lua", 
             value=f"✅ พบไฟล์ **{lua_file_name}** และพร้อมส่ง!", 
             inline=False
         )
-        file = nextcord.File(lua_file_path, filename=lua_file_name)
-        await interaction.followup.send(embed=embed, file=file)
-        os.remove(lua_file_path)
+    elif upstream_breakers.is_open(FILE_SERVER_HOST):
+        embed.add_field(name="📄 สถานะไฟล์ .lua", value=FILE_SERVER_DOWN_NOTE, inline=False)
     else:
         embed.add_field(
             name="📄 สถานะไฟล์ .lua", 
             value="❌ ไม่พบไฟล์ .lua หรือเกิดข้อผิดพลาดในการดาวน์โหลด/แตกไฟล์", 
             inline=False
         )
-        await interaction.followup.send(embed=embed)
-
-@bot.slash_command(name="check_file", description="ตรวจสอบรายชื่อไฟล์ใน ZIP จาก App ID")
-async def check_file(interaction: nextcord.Interaction, app_id: str = nextcord.SlashOption(
-    name="appid",
-    description="ใส่ App ID (เช่น 2947440)",
-    required=True
-)):
-    if interaction.channel_id not in ALLOWED_CHANNEL_IDS:
-        await interaction.response.send_message("ไม่มีสิทธิในการใช้งาน กรุณาใช้คำสั่งที่ <#1422199765818413116>", ephemeral=True)
-        return
-
-    if not app_id.isdigit():
-        await interaction.response.send_message("App ID ต้องเป็นตัวเลขเท่านั้น!", ephemeral=True)
-        return
-
-    await interaction.response.defer()
-
-    steam_data = get_steam_info(app_id)
-    file_list = list_files_in_zip(app_id)
+    return embed
 
+def build_file_list_embed(app_id: str, steam_data, file_list) -> nextcord.Embed:
+    list_pending = file_list is PENDING
     embed = nextcord.Embed(
         title=f"🔎 รายชื่อไฟล์ใน ZIP สำหรับ App ID: {app_id}",
-        color=0x00FF00 if file_list else 0xFF0000
+        color=0xAAAAAA if list_pending else 0x00FF00 if file_list else 0xFF0000
     )
 
-    if steam_data:
-        embed.add_field(name="ชื่อแอป", value=steam_data['name'], inline=False)
-        if steam_data['developer'] != 'ไม่ระบุ':
-            embed.add_field(name="ผู้พัฒนา", value=steam_data['developer'], inline=False)
-        if steam_data['dlc_count'] > 0:
-            embed.add_field(
-                name="",
-                value=f"📦 สถานะ DLC: ✅ พบ DLC\n(ไม่ทราบจำนวนDLCที่พบและสูญหาย)",
-                inline=False
-            )
-        else:
-            embed.add_field(
-                name="",
-                value="📦 สถานะ DLC: ℹ️ ไม่พบ DLC",
-                inline=False
-            )
-        
-        if steam_data['image']:
-            embed.set_image(url=steam_data['image'])
-            embed.set_footer(text="Discord • DEV/g0d • Solus")
-    else:
-        embed.add_field(name="สถานะ Steam", value="ไม่พบข้อมูลเกมบน Steam", inline=False)
-        embed.set_footer(text="discord • DEV/g0d • Solus")
+    add_steam_fields(embed, app_id, steam_data)
 
-    if file_list:
+    if list_pending:
+        embed.add_field(name="📄 รายชื่อไฟล์ใน ZIP", value="⏳ กำลังตรวจสอบไฟล์ ZIP...", inline=False)
+    elif file_list:
         file_list_str = "\n".join([f"• {file}" for file in file_list])
         embed.add_field(
             name="📄 รายชื่อไฟล์ใน ZIP", 
             value=f"✅ พบ **{len(file_list)}** ไฟล์\n{file_list_str}", 
             inline=False
         )
+    elif upstream_breakers.is_open(FILE_SERVER_HOST):
+        embed.add_field(name="📄 รายชื่อไฟล์ใน ZIP", value=FILE_SERVER_DOWN_NOTE, inline=False)
     else:
         embed.add_field(
             name="📄 รายชื่อไฟล์ใน ZIP", 
@@ -420,18 +306,16 @@ async def check_file(interaction: nextcord.Interaction, app_id: str = nextcord.S
             inline=False
         )
 
-    await interaction.followup.send(embed=embed)
+    return embed
 
-@bot.slash_command(name="info", description="แสดงข้อมูล Solus Database")
-async def info(interaction: nextcord.Interaction):
-    if interaction.channel_id not in ALLOWED_CHANNEL_IDS:
-        await interaction.response.send_message("ไม่มีสิทธิในการใช้งาน กรุณาใช้คำสั่งที่ <#1422199765818413116>", ephemeral=True)
-        return
-
-    await interaction.response.defer()
+def build_info_embed(snapshot) -> nextcord.Embed:
+    if snapshot is PENDING:
+        embed = nextcord.Embed(title="📝 Solus Database", description="⏳ กำลังตรวจสอบสถานะ...", color=0xAAAAAA)
+        embed.set_footer(text="Discord • DEV/g0d • Solus")
+        return embed
 
-    morrenus_data = fetch_morrenus_database()
-    status = check_morrenus_status()
+    morrenus_data = snapshot['data']
+    status = snapshot['online']
 
     embed = nextcord.Embed(
         title="📝 Solus Database",
@@ -451,70 +335,65 @@ async def info(interaction: nextcord.Interaction):
     embed.add_field(name="", value=f"📦 รวมแอปทั้งหมด: {total_combined}", inline=False)
     embed.add_field(name="", value=f"📊 Limit: Unlimited (ไม่จำกัด)", inline=False)
     embed.add_field(name="", value=f"📊 Status: {status_text}", inline=False)
+    embed.add_field(name="", value=f"🕒 ตรวจสอบล่าสุด: <t:{int(snapshot['checked_at'])}:R>", inline=False)
 
     embed.set_footer(text="Discord • DEV/g0d • Solus")
+    return embed
+
+# --- 4. Command Pipeline ---
+# Plug the catalog and archive cache into the shared lookups; catalog names win over Steam's in the name index
+file_gates.append(catalog_rules_out)
+probe_warmers.append(warm_zip_index)
+app_name_sources.append(game_catalog.names)
+dlc_notes.append(dlc_catalog_note)
+refreshers.append(morrenus_refresher)
+
+async def load_morrenus_snapshot(_=None) -> dict:
+    await restore_morrenus_snapshot()
+    if morrenus_snapshot['checked_at'] is None:
+        # Only before the first background refresh has landed, with nothing kept from the last run
+        await morrenus_requests.run('snapshot', update_morrenus_snapshot)
+    return morrenus_snapshot
+
+def render_lua(app_id: str, steam_data, lua_result):
+    embed = build_lua_embed(app_id, steam_data, lua_result)
+    lua_file_name, lua_buffer = (None, None) if lua_result is PENDING else lua_result
+    if lua_buffer and lua_file_name:
+        # A partial render and the final edit both attach the file; nextcord.File reads its buffer to EOF
+        return {'embed': embed, 'file': nextcord.File(io.BytesIO(lua_buffer.getvalue()), filename=lua_file_name)}
+    return embed
+
+file_list_lookup = Lookup(list_files_in_zip, peek_file_list)
+lua_lookup = Lookup(download_and_extract_lua)
 
-    await interaction.followup.send(embed=embed)
-
-@bot.slash_command(name="download", description="Bypass สำหรับ gofile หรือ pixeldrain")
-async def download(interaction: nextcord.Interaction, urls: str = nextcord.SlashOption(
-    name="urls",
-    description="ใส่ลิงก์ gofile หรือ pixeldrain (คั่นด้วยเครื่องหมาย , หากมีหลายลิงก์)",
+# --- 5. Slash Commands ---
+@bot.slash_command(name="check_lua", description="ดึงไฟล์ .lua จาก App ID")
+async def check_lua(interaction: nextcord.Interaction, app_id: str = nextcord.SlashOption(
+    name="appid",
+    description="ใส่ App ID (เช่น 2947440)",
     required=True
 )):
-    if interaction.channel_id not in ALLOWED_CHANNEL_IDS:
-        await interaction.response.send_message("ไม่มีสิทธิในการใช้งาน กรุณาใช้คำสั่งที่ <#1422199765818413116>", ephemeral=True)
-        return
+    await pipeline.run(interaction, "check_lua", render_lua, [steam_lookup, lua_lookup],
+                       parse=functools.partial(parse_numeric_app_id, app_id), record=True)
 
-    await interaction.response.defer()
-
-    # แยก URLs ถ้ามีหลายอัน
-    url_list = [url.strip() for url in urls.split(",")]
-    converted_urls = []
-    
-    for url in url_list:
-        converted_url, original_url, file_id, flag = convert_download_url(url)
-        if converted_url and original_url and file_id and flag:
-            converted_urls.append((converted_url, original_url, file_id, flag))
-    
-    embed = nextcord.Embed(
-        title="📥 Bypass Download Limiter",
-        color=0x00FF00 if converted_urls else 0xFF0000
-    )
+@bot.slash_command(name="check_file", description="ตรวจสอบรายชื่อไฟล์ใน ZIP จาก App ID")
+async def check_file(interaction: nextcord.Interaction, app_id: str = nextcord.SlashOption(
+    name="appid",
+    description="ใส่ App ID (เช่น 2947440)",
+    required=True
+)):
+    await pipeline.run(interaction, "check_file", build_file_list_embed, [steam_lookup, file_list_lookup],
+                       parse=functools.partial(parse_numeric_app_id, app_id), record=True)
 
-    if converted_urls:
-        for converted_url, original_url, file_id, flag in converted_urls:
-            embed.add_field(
-                name="",
-                value=f"🔗 {flag} [/{file_id}]({original_url}) | [Bypass ↗]({converted_url})",
-                inline=False
-            )
-    else:
-        embed.add_field(
-            name="",
-            value="❌ รองรับเฉพาะลิงก์ gofile และ pixeldrain เท่านั้น",
-            inline=False
-        )
+@bot.slash_command(name="info", description="แสดงข้อมูล Solus Database")
+async def info(interaction: nextcord.Interaction):
+    await pipeline.run(interaction, "info", lambda _, snapshot: build_info_embed(snapshot), [Lookup(load_morrenus_snapshot)])
 
-    embed.set_footer(text="Discord • DEV/g0d • GameDrive.Org")
-    await interaction.followup.send(embed=embed)
-    
-# --- 6. Discord Events ---
-@bot.event
-async def on_ready():
-    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
-    print('Bot is ready and running!')
-    await bot.change_presence(activity=nextcord.Activity(type=nextcord.ActivityType.watching, name="24/7 for Manifest"))
+# --- 6. Health & Metrics Server ---
+health_server.register("archive_cache", archive_cache.stats)
+health_server.register("catalog", lambda: dict(zip(('apps', 'dlc'), game_catalog.totals)))
+health_server.register("morrenus", lambda: {'online': morrenus_snapshot['online'], **morrenus_refresher.stats()})
 
 # --- 7. Main Execution ---
 if __name__ == '__main__':
-    keep_alive() 
-    try:
-        if not DISCORD_BOT_TOKEN or DISCORD_BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
-            print("FATAL ERROR: Please set the DISCORD_BOT_TOKEN environment variable or change the default value.")
-        else:
-            bot.run(DISCORD_BOT_TOKEN)
-    except nextcord.errors.LoginFailure:
-        print("FATAL ERROR: Invalid Discord Bot Token. Please check your token.")
-    except Exception as e:
-        print(f"An error occurred while running the bot: {e}")
+    run(__file__)
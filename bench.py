@@ -0,0 +1,419 @@
+"""Offline load benchmark for the slash command handlers.
+
+Starts a local stand-in for Steam appdetails, the devg0d app_request
+redirect + ZIP download, the Morrenus API and the /download bypass hosts in
+a child process, points the bot's upstream URLs at it, then calls the
+command callbacks with mocked Interactions at a fixed concurrency and
+reports throughput, latency percentiles and peak RSS.
+
+    python bench.py --commands gen,check_lua --requests 500 --concurrency 50 --latency 0.05 --error-rate 0.02
+    python bench.py --micro
+
+--micro skips the commands and times the input parsers per call instead.
+
+Everything else (cache TTLs, rate limits, WORKER_THREADS, hedging, ...) is
+read from the environment by the bot as usual, so caching and concurrency
+modes are compared by changing env between runs. Commands run one after
+another in the same process and share its caches; run a single command to
+measure it cold.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import socket
+import sys
+import tempfile
+import time
+import timeit
+import zipfile
+from types import SimpleNamespace
+
+from aiohttp import web
+
+import parsing
+
+COMMANDS = ("gen", "check_lua", "check_file", "info", "download")
+FIRST_APP_ID = 100000
+
+# The command and upstream rate limits would otherwise measure themselves; set these to compare limited runs
+BENCH_DEFAULTS = {
+    "COMMAND_USER_RATE": "1000000",
+    "COMMAND_USER_BURST": "1000000",
+    "COMMAND_CHANNEL_RATE": "1000000",
+    "COMMAND_CHANNEL_BURST": "1000000",
+    "UPSTREAM_RATE": "1000000",
+    "UPSTREAM_BURST": "1000000",
+    "UPSTREAM_QUEUE_MAX": "1000000",
+    "SLOW_COMMAND_SECONDS": "inf",
+    "SHARED_CACHE_PATH": "",
+}
+
+
+# --- Fake upstream ---
+def byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Inclusive (start, end) for a single-range "bytes=" header, or None to send everything."""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header or "")
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        return max(0, size - int(end)), size - 1
+    return int(start), min(size - 1, int(end)) if end else size - 1
+
+
+def build_archive(app_id: str, archive_size: int) -> bytes:
+    rng = random.Random(app_id)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        lua = "".join(f'addappid({int(app_id) + n}, 1, "{rng.getrandbits(256):064x}")\n' for n in range(64))
+        archive.writestr(f"{app_id}.lua", lua)
+        # Manifests are already compressed upstream, so random bytes are close to the real ratio
+        for depot in range(4):
+            archive.writestr(f"{int(app_id) + depot + 1}.manifest", rng.randbytes(max(1, archive_size // 4)))
+    return buffer.getvalue()
+
+
+def build_upstream_app(latency: float, jitter: float, error_rate: float, archive_size: int,
+                       distinct: int, missing_rate: float) -> web.Application:
+    archives: dict[str, bytes] = {}
+    app_ids = [str(FIRST_APP_ID + n) for n in range(distinct)]
+    games = {
+        'total': len(app_ids),
+        'total_dlc': len(app_ids) * 2,
+        'games': [{'app_id': int(app_id), 'name': f"Bench Game {app_id}",
+                   'dlc': [int(app_id) * 10 + 1, int(app_id) * 10 + 2]} for app_id in app_ids],
+    }
+    games_body = json.dumps(games).encode()
+    games_etag = f'"games-{len(games_body)}"'
+
+    def has_file(app_id: str) -> bool:
+        return random.Random(f"missing-{app_id}").random() >= missing_rate
+
+    @web.middleware
+    async def conditions(request: web.Request, handler):
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        if random.random() < error_rate:
+            return web.Response(status=500, text="injected failure")
+        return await handler(request)
+
+    async def appdetails(request: web.Request) -> web.Response:
+        app_id = request.query.get("appids", "")
+        data = {
+            'name': f"Bench Game {app_id}",
+            'developer': "Bench Studio",
+            'header_image': f"https://example.invalid/{app_id}/header.jpg",
+            'dlc': [int(app_id) * 10 + 1, int(app_id) * 10 + 2] if app_id.isdigit() else [],
+            'release_date': {'date': "Jan 5, 2024"},
+            'drm_notice': "Denuvo Anti-tamper" if app_id.endswith("7") else "",
+        }
+        return web.json_response({app_id: {'success': app_id.isdigit(), 'data': data}})
+
+    async def app_request(request: web.Request) -> web.Response:
+        app_id = request.match_info["app_id"]
+        if not has_file(app_id):
+            return web.Response(status=404, text="not found")
+        raise web.HTTPFound(f"/files/{app_id}.zip")
+
+    async def archive(request: web.Request) -> web.Response:
+        app_id = request.match_info["app_id"]
+        if not has_file(app_id):
+            return web.Response(status=404, text="not found")
+        data = archives.get(app_id)
+        if data is None:
+            data = archives[app_id] = build_archive(app_id, archive_size)
+        headers = {
+            "Content-Disposition": f'attachment; filename="{app_id}.zip"',
+            "Accept-Ranges": "bytes",
+            "ETag": f'"{app_id}-{len(data)}"',
+        }
+        span = byte_range(request.headers.get("Range"), len(data))
+        if span is None:
+            return web.Response(body=data, headers=headers, content_type="application/zip")
+        start, end = span
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        return web.Response(status=206, body=data[start:end + 1], headers=headers, content_type="application/zip")
+
+    async def morrenus_games(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == games_etag:
+            return web.Response(status=304, headers={"ETag": games_etag})
+        return web.Response(body=games_body, content_type="application/json", headers={"ETag": games_etag})
+
+    async def morrenus_home(request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def bypass(request: web.Request) -> web.Response:
+        file_id = request.match_info["file_id"]
+        return web.Response(body=b"\0" * 1024, content_type="application/octet-stream",
+                            headers={"Content-Disposition": f'attachment; filename="{file_id}.bin"'})
+
+    app = web.Application(middlewares=[conditions])
+    app.router.add_get("/steam/appdetails", appdetails)
+    app.router.add_get("/app_request/{app_id}", app_request)
+    app.router.add_get("/files/{app_id}.zip", archive)
+    app.router.add_get("/morrenus/api/games", morrenus_games)
+    app.router.add_get("/morrenus/", morrenus_home)
+    app.router.add_get("/gf/{file_id}", bypass)
+    app.router.add_get("/pd/{file_id}", bypass)
+    return app
+
+
+def serve_upstream(port: int, ready, options: dict):
+    async def serve():
+        runner = web.AppRunner(build_upstream_app(**options), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def upstream_env(base: str, workdir: str) -> dict[str, str]:
+    return {
+        "STEAM_APP_DETAILS_URL": f"{base}/steam/appdetails?appids=",
+        "DEVGOD_BASE_URL": f"{base}/app_request/",
+        "MORRENUS_GAMES_URL": f"{base}/morrenus/api/games",
+        "MORRENUS_STATUS_URL": f"{base}/morrenus/",
+        "GOFILE_BYPASS_URL": f"{base}/gf/",
+        "PIXELDRAIN_BYPASS_URL": f"{base}/pd/",
+        "CATALOG_PATH": os.path.join(workdir, "catalog.sqlite3"),
+        "ARCHIVE_CACHE_DIR": os.path.join(workdir, "archives"),
+    }
+
+
+# --- Mocked Discord objects ---
+class BenchResponse:
+    def __init__(self, interaction: "BenchInteraction"):
+        self.interaction = interaction
+
+    async def defer(self, *args, **kwargs):
+        await asyncio.sleep(self.interaction.discord_latency)
+
+    async def send_message(self, *args, **kwargs):
+        await asyncio.sleep(self.interaction.discord_latency)
+        self.interaction.rejected = True
+
+
+class BenchFollowup:
+    def __init__(self, interaction: "BenchInteraction"):
+        self.interaction = interaction
+
+    async def send(self, *args, **kwargs):
+        await asyncio.sleep(self.interaction.discord_latency)
+        self.interaction.messages += 1
+
+
+class BenchInteraction:
+    """Just enough of nextcord.Interaction for the command handlers."""
+
+    def __init__(self, channel_id: int, user_id: int, discord_latency: float):
+        self.channel_id = channel_id
+        self.user = SimpleNamespace(id=user_id)
+        self.discord_latency = discord_latency
+        self.response = BenchResponse(self)
+        self.followup = BenchFollowup(self)
+        self.messages = 0
+        self.rejected = False
+
+    async def edit_original_message(self, *args, **kwargs):
+        await asyncio.sleep(self.discord_latency)
+
+
+# --- Driver ---
+def percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def command_arguments(command: str, app_id: str) -> tuple:
+    if command == "info":
+        return ()
+    if command == "download":
+        return f"https://gofile.io/d/g{app_id}, https://pixeldrain.com/u/p{app_id}", True
+    return (app_id,)
+
+
+def find_command(module, core, command: str):
+    # Each bot script defines its own commands; the ones both bots share live in core.py
+    return getattr(module, command, None) or getattr(core, command, None)
+
+
+async def drive(module, core, command: str, args) -> dict:
+    callback = find_command(module, core, command).callback
+    channel_id = next(iter(core.ALLOWED_CHANNEL_IDS))
+    rng = random.Random(command)
+    latencies, ok, rejected, errors = [], 0, 0, 0
+    calls = iter(range(args.requests))
+
+    async def user():
+        nonlocal ok, rejected, errors
+        for n in calls:
+            app_id = str(FIRST_APP_ID + rng.randrange(args.distinct))
+            interaction = BenchInteraction(channel_id, n, args.discord_latency)
+            started = time.perf_counter()
+            try:
+                await callback(interaction, *command_arguments(command, app_id))
+            except Exception as e:
+                errors += 1
+                print(f"{command} raised {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            latencies.append(time.perf_counter() - started)
+            if interaction.rejected and not interaction.messages:
+                rejected += 1
+            else:
+                ok += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(args.concurrency)))
+    # Stale answers may still be waiting to edit their message; let them land before the next command
+    await core.pipeline.drain()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'command': command,
+        'requests': args.requests,
+        'ok': ok,
+        'rejected': rejected,
+        'errors': errors,
+        'elapsed': elapsed,
+        'throughput': args.requests / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+async def run(module, core, commands: list[str], args) -> tuple[list[dict], int]:
+    results = []
+    log = io.StringIO()
+    try:
+        # The bot's own error prints would drown the report; they are counted instead
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+            for command in commands:
+                results.append(await drive(module, core, command, args))
+    finally:
+        await core.http.close()
+        core.workers.shutdown()
+    return results, log.getvalue().count("\n")
+
+
+def print_report(results: list[dict], core, log_lines: int):
+    print(f"{'command':<12}{'ok':>7}{'rej':>6}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'rss MB':>9}")
+    for result in results:
+        print(f"{result['command']:<12}{result['ok']:>7}{result['rejected']:>6}{result['errors']:>6}"
+              f"{result['throughput']:>10.1f}{result['p50'] * 1000:>10.1f}{result['p95'] * 1000:>10.1f}"
+              f"{result['p99'] * 1000:>10.1f}{result['max'] * 1000:>10.1f}{result['peak_rss_mb']:>9.1f}")
+    print("\nstage p95 (ms):")
+    for (command, stage), histogram in sorted(core.tracer.commands.items()):
+        if stage != "total":
+            print(f"  {command}/{stage}: {histogram.quantile(0.95) * 1000:.1f} ({histogram.count} calls)")
+    print(f"\nbot log lines suppressed: {log_lines}" if log_lines else "")
+
+
+def micro_benchmarks(number: int):
+    bulk = ", ".join(f"https://store.steampowered.com/app/{FIRST_APP_ID + n}/" if n % 2 else str(FIRST_APP_ID + n) for n in range(50))
+    bypass_urls = {'gofile': "https://gf.example/", 'pixeldrain': "https://pd.example/"}
+    cases = [
+        ("extract_app_id (memoized)", lambda: parsing.extract_app_id("https://store.steampowered.com/app/730/")),
+        ("extract_app_id (first call)", lambda: parsing.extract_app_id.__wrapped__("https://store.steampowered.com/app/730/")),
+        ("extract_app_ids (50 ids)", lambda: parsing.extract_app_ids(bulk)),
+        ("convert_download_url", lambda: parsing.convert_download_url("https://pixeldrain.com/u/abc123", bypass_urls)),
+        ("content_disposition_filename", lambda: parsing.content_disposition_filename("attachment; filename*=UTF-8''game%20v1.zip")),
+        ("format_release_date (memoized)", lambda: parsing.format_release_date("Jan 5, 2024")),
+        ("format_release_date (first call)", lambda: parsing.format_release_date.__wrapped__("Jan 5, 2024")),
+    ]
+    print(f"{'parser':<36}{'us/call':>10}")
+    for name, func in cases:
+        per_call = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print(f"{name:<36}{per_call * 1e6:>10.3f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bot", default="backup_bot", help="module to benchmark: backup_bot or bot")
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="comma-separated commands, run in order")
+    parser.add_argument("--requests", type=int, default=200, help="invocations per command")
+    parser.add_argument("--concurrency", type=int, default=20, help="invocations in flight at once")
+    parser.add_argument("--distinct", type=int, default=50, help="size of the app_id pool; smaller means more cache hits")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every upstream response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="+/- random seconds around --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream responses that are 500s")
+    parser.add_argument("--missing-rate", type=float, default=0.1, help="fraction of app_ids without a file")
+    parser.add_argument("--archive-size", type=int, default=256 * 1024, help="approximate bytes of manifests per archive")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="seconds added to each mocked Discord call")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="let the bot's own log lines through")
+    parser.add_argument("--micro", action="store_true", help="time the input parsers instead of the commands")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.micro:
+        micro_benchmarks(number=20000)
+        return
+
+    upstream_options = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'archive_size': args.archive_size,
+        'distinct': args.distinct,
+        'missing_rate': args.missing_rate,
+    }
+
+    with contextlib.closing(socket.socket()) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    # A separate process keeps the stand-in's CPU and memory out of the measurements
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    upstream = context.Process(target=serve_upstream, args=(port, ready, upstream_options), daemon=True)
+    upstream.start()
+    try:
+        if not ready.wait(30):
+            sys.exit("Fake upstream did not start")
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            os.environ.update(upstream_env(f"http://127.0.0.1:{port}", workdir))
+            for name, value in BENCH_DEFAULTS.items():
+                os.environ.setdefault(name, value)
+
+            module = importlib.import_module(args.bot)
+            core = importlib.import_module("core")
+            commands = [command.strip() for command in args.commands.split(",") if command.strip()]
+            missing = [command for command in commands if find_command(module, core, command) is None]
+            if missing:
+                print(f"Skipping commands not in {args.bot}: {', '.join(missing)}")
+            commands = [command for command in commands if command not in missing]
+
+            results, log_lines = core.bot.loop.run_until_complete(run(module, core, commands, args))
+    finally:
+        upstream.terminate()
+        upstream.join()
+
+    print_report(results, core, log_lines)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'options': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
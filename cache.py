@@ -0,0 +1,189 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+
+# Default for TTLCache.get when a cached None has to be told apart from a miss
+MISSING = object()
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a TTL.
+
+    Negative results (e.g. Steam answering ``success: false``) can be stored
+    with their own, usually shorter, TTL so a typo'd app ID is retried sooner
+    than a real game is refreshed.
+
+    With ``stale_ttl`` set, expired entries are kept that much longer so
+    get_stale() can still serve them while an upstream is down.
+
+    With ``shared`` (a ``shared_cache.SharedCache``), every set() is written
+    through to the shared store under ``namespace`` so other processes pick
+    the value up. get() and get_stale() only look at this process's entries;
+    async callers await load() first, which reads a local miss from the
+    store, on a worker pool when given one. ``encode`` and ``decode`` convert
+    values that are not plain JSON.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, negative_ttl: float | None = None,
+                 stale_ttl: float = 0.0, shared=None, namespace: str = "", encode=None, decode=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.stale_ttl = stale_ttl
+        self.shared = shared
+        self.namespace = namespace
+        self.encode = encode
+        self.decode = decode
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.shared_hits = 0
+
+    async def load(self, key, pool=None):
+        """Copy key from the shared store into the local cache unless it is fresh here already."""
+        if self.shared is None or key in self:
+            return
+        read = functools.partial(self.shared.get, self.namespace, str(key))
+        row = await pool.run(read) if pool is not None else read()
+        # A set() while the read was in flight is newer than the stored row
+        if row is not None and key not in self:
+            self._install(key, row)
+
+    def _install(self, key, row):
+        value, expires_at, _ = row
+        if value is not None and self.decode is not None:
+            value = self.decode(value)
+        # Wall-clock expiry from the store, converted to this process's monotonic clock
+        entry = (value, time.monotonic() + expires_at - time.time())
+        self._data[key] = entry
+        self._trim()
+        self.shared_hits += 1
+
+    def _trim(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key, default=None):
+        """Value for key even if expired, as long as it is within stale_ttl of expiring."""
+        entry = self._data.get(key)
+        if entry is None or entry[1] + self.stale_ttl <= time.monotonic():
+            return default
+        self.stale_hits += 1
+        return entry[0]
+
+    def set(self, key, value, negative: bool = False, ttl: float | None = None):
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttl
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        self._trim()
+        if self.shared is not None:
+            encoded = value if value is None or self.encode is None else self.encode(value)
+            self.shared.set(self.namespace, str(key), encoded, ttl, self.stale_ttl)
+
+    def ttl_remaining(self, key) -> float:
+        """Seconds until key expires (0 when absent); does not count as a lookup."""
+        entry = self._data.get(key)
+        return max(0.0, entry[1] - time.monotonic()) if entry is not None else 0.0
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'stale_hits': self.stale_hits,
+            'shared_hits': self.shared_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class RequestCoalescer:
+    """Shares one in-flight call between concurrent callers asking for the same key.
+
+    The shared task is shielded, so a caller whose interaction gets cancelled
+    does not cancel the lookup for everyone else waiting on it. start() runs
+    the same shared call in the background for callers that answered from a
+    stale value and only want it refreshed.
+    """
+
+    def __init__(self):
+        self._inflight: dict = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.background = 0
+
+    def _task(self, key, factory) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        self.calls += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+
+        def forget(_):
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+        task.add_done_callback(forget)
+        return task
+
+    async def run(self, key, factory):
+        return await asyncio.shield(self._task(key, factory))
+
+    def start(self, key, factory) -> asyncio.Task:
+        """Start (or join) the shared call for key without waiting for it."""
+        self.background += 1
+        task = self._task(key, factory)
+
+        def report(done: asyncio.Task):
+            if not done.cancelled() and done.exception() is not None:
+                print(f"Background refresh of {key} failed: {done.exception()}")
+
+        task.add_done_callback(report)
+        return task
+
+    def stats(self) -> dict:
+        return {'inflight': len(self._inflight), 'calls': self.calls, 'coalesced': self.coalesced,
+                'background': self.background}
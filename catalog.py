@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    app_id INTEGER PRIMARY KEY,
+    name TEXT,
+    is_dlc INTEGER NOT NULL DEFAULT 0,
+    parent_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS apps_parent ON apps (parent_id) WHERE parent_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS apps_dlc ON apps (is_dlc);
+"""
+
+
+def as_app_id(value) -> int | None:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def parse_games_listing(data) -> list[tuple[int, str | None, int, int | None]]:
+    """Flatten the Morrenus games JSON into (app_id, name, is_dlc, parent_id) rows.
+
+    Games may sit under "games", "data" or "items" (or be the top-level
+    list), and DLCs either as their own rows flagged by type/is_dlc or nested
+    in a game's "dlc" list.
+    """
+    if isinstance(data, dict):
+        entries = next((data[key] for key in ('games', 'data', 'items') if isinstance(data.get(key), list)), [])
+    elif isinstance(data, list):
+        entries = data
+    else:
+        entries = []
+
+    rows = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        app_id = as_app_id(entry.get('app_id', entry.get('appid', entry.get('id'))))
+        if app_id is None:
+            continue
+        parent_id = as_app_id(entry.get('parent_id', entry.get('parent', entry.get('base_app_id'))))
+        is_dlc = entry.get('is_dlc') is True or str(entry.get('type', '')).lower() == 'dlc' or parent_id is not None
+        rows[app_id] = (app_id, entry.get('name') or entry.get('title'), int(is_dlc), parent_id)
+
+        for dlc in entry.get('dlc') or []:
+            dlc_id = as_app_id(dlc.get('app_id', dlc.get('appid', dlc.get('id'))) if isinstance(dlc, dict) else dlc)
+            if dlc_id is not None and dlc_id not in rows:
+                name = dlc.get('name') if isinstance(dlc, dict) else None
+                rows[dlc_id] = (dlc_id, name, 1, app_id)
+    return list(rows.values())
+
+
+class GameCatalog:
+    """SQLite copy of the Morrenus game list for instant membership and DLC lookups.
+
+    sync() is meant to run on a worker thread while commands keep reading on
+    the event loop. Every thread gets its own connection and the file is in
+    WAL mode, so the loop's point lookups read the last committed catalog
+    instead of waiting for the writer.
+    """
+
+    def __init__(self, path: str):
+        if path == ":memory:":
+            # One named in-memory database, so every thread's connection sees the same tables
+            path = f"file:catalog-{id(self)}?mode=memory&cache=shared"
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        # The creating thread's connection; also keeps a shared in-memory database alive
+        self.db = self._connection()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        # Kept in Python so the per-command "is the catalog loaded" check and /metrics are free
+        self.size = self.db.execute("SELECT COUNT(*) FROM apps").fetchone()[0]
+        self.totals = self.counts()
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, uri=self.path.startswith("file:"))
+        return db
+
+    def sync(self, rows: list[tuple[int, str | None, int, int | None]]) -> tuple[int, int, int]:
+        """Bring the table in line with rows, touching only what changed.
+
+        Returns (added, updated, removed).
+        """
+        db = self._connection()
+        current = {row[0]: row for row in db.execute("SELECT app_id, name, is_dlc, parent_id FROM apps")}
+        incoming = {row[0]: row for row in rows}
+        added = [row for app_id, row in incoming.items() if app_id not in current]
+        updated = [row for app_id, row in incoming.items() if app_id in current and current[app_id] != row]
+        removed = [(app_id,) for app_id in current if app_id not in incoming]
+
+        with db:
+            db.executemany("INSERT OR REPLACE INTO apps VALUES (?, ?, ?, ?)", added + updated)
+            db.executemany("DELETE FROM apps WHERE app_id = ?", removed)
+        self.size = len(incoming)
+        self.totals = self.counts()
+        return len(added), len(updated), len(removed)
+
+    def reload_totals(self):
+        """Re-count the rows, for a process reading a catalog that another process syncs."""
+        self.size = self._connection().execute("SELECT COUNT(*) FROM apps").fetchone()[0]
+        self.totals = self.counts()
+
+    def __len__(self):
+        return self.size
+
+    def contains(self, app_id) -> bool:
+        return self._connection().execute("SELECT 1 FROM apps WHERE app_id = ?", (as_app_id(app_id),)).fetchone() is not None
+
+    def dlc_of(self, app_id) -> list[int]:
+        rows = self._connection().execute("SELECT app_id FROM apps WHERE parent_id = ? ORDER BY app_id", (as_app_id(app_id),))
+        return [row[0] for row in rows]
+
+    def names(self) -> list[tuple[int, str]]:
+        return self._connection().execute("SELECT app_id, name FROM apps WHERE name IS NOT NULL").fetchall()
+
+    def counts(self) -> tuple[int, int]:
+        """(base apps, DLCs) currently in the catalog; scans the table, so the loop reads ``totals`` instead."""
+        apps, dlc = self._connection().execute(
+            "SELECT COUNT(*) - COALESCE(SUM(is_dlc), 0), COALESCE(SUM(is_dlc), 0) FROM apps").fetchone()
+        return apps, dlc
+
+    def matches(self, counters: dict | None) -> bool:
+        """True when the catalog holds exactly the ``total`` / ``total_dlc`` the listing reports."""
+        if not counters:
+            return False
+        return self.totals == (counters.get('total'), counters.get('total_dlc'))
+
+    def close(self):
+        self.db.close()
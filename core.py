@@ -0,0 +1,743 @@
+# Everything bot.py and backup_bot.py have in common: configuration, the HTTP client and caches,
+# the Steam / file-server / link lookups, the shared embeds and commands (/gen, /gen_bulk, /download),
+# health server and main()
+import nextcord
+from nextcord.ext import commands
+import asyncio
+import functools
+import os
+import sys
+import signal
+import contextlib
+import math
+from urllib.parse import urlsplit
+from http_client import http, HTTP_ERRORS, ProbeResult
+from cache import TTLCache, RequestCoalescer, MISSING
+from prefetch import Prefetcher
+from periodic import PeriodicTask
+from app_index import AppNameIndex
+from pagination import EmbedPaginator
+from ratelimit import KeyedRateLimiter, UpstreamLimiter
+from resilience import CircuitBreakers
+from workers import WorkerPool, default_workers
+from shared_cache import SharedCache
+from sharding import parse_shard_ids, launch_shard_processes
+from health import HealthServer
+from tracing import Tracer, traced
+from pipeline import CommandPipeline, CommandRejected, Lookup, PENDING
+from parsing import extract_app_id, extract_app_ids, convert_download_url, content_disposition_filename, format_release_date, loads_in_pieces
+
+# --- 1. Configuration & API Endpoints ---
+DISCORD_BOT_TOKEN = os.environ.get("DISCORD_BOT_TOKEN", "YOUR_BOT_TOKEN_HERE") 
+ALLOWED_CHANNEL_IDS = frozenset({1098314625646329966, 1422199765818413116})
+# Upstream base URLs; overridable so the bench harness (bench.py) can point them at a local stand-in
+DEVGOD_BASE_URL = os.environ.get("DEVGOD_BASE_URL", "https://devg0d.pythonanywhere.com/app_request/")
+STEAM_APP_DETAILS_URL = os.environ.get("STEAM_APP_DETAILS_URL", "https://store.steampowered.com/api/appdetails?appids=")
+PARTIAL_EMBED_DELAY = float(os.environ.get("PARTIAL_EMBED_DELAY", 2.5))
+STEAM_CACHE_TTL = float(os.environ.get("STEAM_CACHE_TTL", 6 * 3600))
+STEAM_CACHE_NEGATIVE_TTL = float(os.environ.get("STEAM_CACHE_NEGATIVE_TTL", 15 * 60))
+STEAM_CACHE_MAX_ENTRIES = int(os.environ.get("STEAM_CACHE_MAX_ENTRIES", 4096))
+# Resolved download URLs may be signed, so file probes are kept only briefly
+FILE_STATUS_TTL = float(os.environ.get("FILE_STATUS_TTL", 5 * 60))
+FILE_STATUS_NEGATIVE_TTL = float(os.environ.get("FILE_STATUS_NEGATIVE_TTL", 60))
+# Comma-separated app IDs kept warm on top of the most requested ones
+PREFETCH_APP_IDS = [app_id.strip() for app_id in os.environ.get("PREFETCH_APP_IDS", "").split(",")]
+PREFETCH_HOT_SIZE = int(os.environ.get("PREFETCH_HOT_SIZE", 50))
+PREFETCH_INTERVAL = float(os.environ.get("PREFETCH_INTERVAL", 240))
+GOFILE_BYPASS_URL = os.environ.get("GOFILE_BYPASS_URL", "https://gf.1drv.eu.org/")
+PIXELDRAIN_BYPASS_URL = os.environ.get("PIXELDRAIN_BYPASS_URL", "https://pd.1drv.eu.org/")
+DOWNLOAD_BYPASS_URLS = {'gofile': GOFILE_BYPASS_URL, 'pixeldrain': PIXELDRAIN_BYPASS_URL}
+STEAM_APP_LIST_URL = os.environ.get("STEAM_APP_LIST_URL", "https://api.steampowered.com/ISteamApps/GetAppList/v2/")
+APP_INDEX_REFRESH_INTERVAL = float(os.environ.get("APP_INDEX_REFRESH_INTERVAL", 24 * 3600))
+BULK_MAX_IDS = int(os.environ.get("BULK_MAX_IDS", 50))
+BULK_CONCURRENCY = int(os.environ.get("BULK_CONCURRENCY", 8))
+BULK_PAGE_SIZE = 10
+# /download link checks: results are cached per bypass URL, probes are capped per host.
+# A paste of up to LINK_PROBE_PER_HOST links to one host is checked in a single probe's latency;
+# longer ones take another round per LINK_PROBE_PER_HOST, rather than opening unbounded connections
+LINK_STATUS_TTL = float(os.environ.get("LINK_STATUS_TTL", 10 * 60))
+LINK_STATUS_NEGATIVE_TTL = float(os.environ.get("LINK_STATUS_NEGATIVE_TTL", 60))
+LINK_PROBE_PER_HOST = int(os.environ.get("LINK_PROBE_PER_HOST", 25))
+# Keep-alive connections per upstream host; at least LINK_PROBE_PER_HOST or the pool caps the probes instead
+HTTP_LIMIT_PER_HOST = int(os.environ.get("HTTP_LIMIT_PER_HOST", max(LINK_PROBE_PER_HOST, 10)))
+# Token buckets: commands per second (and burst) per user and per channel
+COMMAND_USER_RATE = float(os.environ.get("COMMAND_USER_RATE", 0.2))
+COMMAND_USER_BURST = float(os.environ.get("COMMAND_USER_BURST", 3))
+COMMAND_CHANNEL_RATE = float(os.environ.get("COMMAND_CHANNEL_RATE", 2))
+COMMAND_CHANNEL_BURST = float(os.environ.get("COMMAND_CHANNEL_BURST", 20))
+# Outgoing requests per second per upstream host; Steam's store API bans bursty IPs
+UPSTREAM_RATE = float(os.environ.get("UPSTREAM_RATE", 10))
+UPSTREAM_BURST = float(os.environ.get("UPSTREAM_BURST", 20))
+STEAM_STORE_RATE = float(os.environ.get("STEAM_STORE_RATE", 1))
+STEAM_STORE_BURST = float(os.environ.get("STEAM_STORE_BURST", 20))
+# New commands are turned away once this many upstream requests are waiting
+UPSTREAM_QUEUE_MAX = int(os.environ.get("UPSTREAM_QUEUE_MAX", 100))
+# Per-host circuit breaker: opens after this many consecutive failures, tries again after the timeout
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", 5))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", 30))
+# A second appdetails request is raced when the first is this slow (0 disables hedging)
+STEAM_HEDGE_DELAY = float(os.environ.get("STEAM_HEDGE_DELAY", 1.5))
+# How long past expiry cached results are still served: refreshed in the background, or as-is while an upstream is failing
+STEAM_CACHE_STALE_TTL = float(os.environ.get("STEAM_CACHE_STALE_TTL", 24 * 3600))
+FILE_STATUS_STALE_TTL = float(os.environ.get("FILE_STATUS_STALE_TTL", 30 * 60))
+# Commands whose lookups can all be peeked (/gen, /check_file) answer from cached (even expired) data at once
+# and edit the message if the background refresh differs
+STALE_WHILE_REVALIDATE = os.environ.get("STALE_WHILE_REVALIDATE", "1") == "1"
+FILE_SERVER_HOST = urlsplit(DEVGOD_BASE_URL).hostname
+# Threads for CPU-bound work (ZIP inflation, large JSON, index builds)
+WORKER_THREADS = int(os.environ.get("WORKER_THREADS", default_workers()))
+# Sharding: SHARD_COUNT / SHARD_IDS pin this process to given shards (default: one process, automatic count).
+# SHARD_PROCESSES > 1 turns this script into a launcher running one bot process per slice of shards.
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", 0)) or None
+SHARD_IDS = parse_shard_ids(os.environ.get("SHARD_IDS", ""))
+SHARD_PROCESSES = int(os.environ.get("SHARD_PROCESSES", 1))
+# SQLite file behind the Steam / file-status caches, shared by every process that points at it and kept
+# across restarts so the bot starts warm; set it to an empty string to keep everything in memory
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", os.path.join(".cache", "shared.sqlite3"))
+# How often the primary process drops shared-cache rows past their stale window
+SHARED_CACHE_PURGE_INTERVAL = float(os.environ.get("SHARED_CACHE_PURGE_INTERVAL", 3600))
+# /healthz fails once the gateway has been down (or heartbeats slower than this) for HEALTH_GRACE seconds
+HEALTH_MAX_LATENCY = float(os.environ.get("HEALTH_MAX_LATENCY", 10))
+HEALTH_GRACE = float(os.environ.get("HEALTH_GRACE", 120))
+# Commands slower than this are logged with a per-stage breakdown
+SLOW_COMMAND_SECONDS = float(os.environ.get("SLOW_COMMAND_SECONDS", 5))
+# Only the process holding shard 0 syncs slash commands and runs the prefetcher
+PRIMARY_PROCESS = SHARD_IDS is None or 0 in SHARD_IDS
+FILE_SERVER_DOWN_NOTE = "⚠️ เซิร์ฟเวอร์ไฟล์ไม่ตอบสนองชั่วคราว กรุณาลองใหม่ภายหลัง"
+
+# Intents
+intents = nextcord.Intents.default()
+intents.messages = True
+intents.message_content = True
+intents.guilds = True
+intents.members = True
+
+bot = commands.AutoShardedBot(
+    command_prefix="/",
+    intents=intents,
+    shard_count=SHARD_COUNT,
+    shard_ids=SHARD_IDS,
+    rollout_register_new=PRIMARY_PROCESS,
+    rollout_update_known=PRIMARY_PROCESS,
+    rollout_delete_unknown=PRIMARY_PROCESS,
+)
+
+shared_cache = SharedCache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
+
+# appdetails responses keyed by app_id; failed lookups are not cached
+steam_cache = TTLCache(maxsize=STEAM_CACHE_MAX_ENTRIES, ttl=STEAM_CACHE_TTL, negative_ttl=STEAM_CACHE_NEGATIVE_TTL,
+                       stale_ttl=STEAM_CACHE_STALE_TTL, shared=shared_cache, namespace="steam")
+# concurrent misses for the same app_id share a single appdetails request
+steam_requests = RequestCoalescer()
+# file probes keyed by app_id (None when no file); the ZIP helpers reuse the resolved URL
+file_status_cache = TTLCache(maxsize=STEAM_CACHE_MAX_ENTRIES, ttl=FILE_STATUS_TTL, negative_ttl=FILE_STATUS_NEGATIVE_TTL,
+                             stale_ttl=FILE_STATUS_STALE_TTL, shared=shared_cache, namespace="file_status",
+                             encode=ProbeResult.to_dict, decode=ProbeResult.from_dict)
+file_probes = RequestCoalescer()
+# /download link status keyed by bypass URL: {'alive', 'name', 'size'}
+link_status_cache = TTLCache(maxsize=STEAM_CACHE_MAX_ENTRIES, ttl=LINK_STATUS_TTL, negative_ttl=LINK_STATUS_NEGATIVE_TTL)
+link_probes = RequestCoalescer()
+link_host_limits: dict[str, asyncio.Semaphore] = {}
+user_limiter = KeyedRateLimiter(COMMAND_USER_RATE, COMMAND_USER_BURST)
+channel_limiter = KeyedRateLimiter(COMMAND_CHANNEL_RATE, COMMAND_CHANNEL_BURST)
+# every request made through http waits for its host's bucket, queueing rather than failing
+upstream_limiter = UpstreamLimiter(UPSTREAM_RATE, UPSTREAM_BURST, overrides={
+    "store.steampowered.com": (STEAM_STORE_RATE, STEAM_STORE_BURST),
+})
+http.limiter = upstream_limiter
+http.limit_per_host = HTTP_LIMIT_PER_HOST
+# a host that keeps failing is skipped for a while; callers fall back to stale cache entries
+upstream_breakers = CircuitBreakers(BREAKER_FAILURES, BREAKER_RESET_TIMEOUT)
+http.breakers = upstream_breakers
+workers = WorkerPool(WORKER_THREADS)
+# stage timings per command and call timings per upstream host, exported on /metrics
+tracer = Tracer(SLOW_COMMAND_SECONDS)
+http.observer = tracer.observe_upstream
+
+# Extension points: backup_bot.py plugs its Morrenus catalog and archive cache in here, bot.py leaves them empty.
+# app_id -> True to report "no file" without probing the file server
+file_gates: list = []
+# async probe -> None, run for each hot app after its file probe is refreshed
+probe_warmers: list = []
+# () -> [(app_id, name)], ranked ahead of the Steam app list in the name index
+app_name_sources: list = []
+# (app_id, dlc_count) -> note under "found DLC", or None to leave it to the next one
+dlc_notes: list = []
+# PeriodicTasks started from on_ready on every process, next to the app index refresher
+refreshers: list = []
+
+# --- 2. Helper Functions ---
+@traced("steam_info")
+async def get_steam_info(app_id):
+    # Expired (or persisted from before a restart) entries are answered now and refreshed in the background
+    await steam_cache.load(app_id, workers)
+    cached, _ = peek_steam_info(app_id)
+    if cached is not MISSING:
+        return cached
+    return await steam_requests.run(app_id, functools.partial(fetch_steam_info, app_id))
+
+def peek(cache: TTLCache, coalescer: RequestCoalescer, key, refresh) -> tuple[object, asyncio.Task | None]:
+    """What the cache already knows about key, without waiting on an upstream.
+
+    (value, None) for a fresh entry, (stale value, background refresh task)
+    for an expired one still inside its stale window, (MISSING, None) for a
+    key never seen.
+    """
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value, None
+    value = cache.get_stale(key, MISSING)
+    if value is MISSING:
+        return MISSING, None
+    return value, coalescer.start(key, functools.partial(revalidate, cache, key, refresh))
+
+async def revalidate(cache: TTLCache, key, refresh):
+    # Another process may have refreshed the entry already; only go upstream if the shared copy is stale too
+    await cache.load(key, workers)
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value
+    return await refresh()
+
+def peek_steam_info(app_id: str) -> tuple[dict, asyncio.Task | None]:
+    return peek(steam_cache, steam_requests, app_id, functools.partial(fetch_steam_info, app_id))
+
+
+async def fetch_steam_info(app_id):
+    release_date_thai = 'ไม่ระบุ'
+    has_denuvo = False
+    header_image_store = None
+    name_store = 'ไม่พบแอป'
+    dlc_count_store = 0
+    store_success = False
+    fetched = False
+    drm_notice = ""
+
+    try:
+        store_url = f"{STEAM_APP_DETAILS_URL}{app_id}&cc=th&l=th"
+        store_resp = await http.get_hedged(store_url, delay=STEAM_HEDGE_DELAY, timeout=5)
+        store_resp.raise_for_status()
+        store_data = store_resp.json()
+        fetched = True
+        if store_data and store_data.get(app_id, {}).get("success") is True:
+            store_info = store_data[app_id].get("data", {})
+            store_success = True
+            name_store = store_info.get("name", 'ไม่พบแอป')
+            header_image_store = store_info.get("header_image")
+            dlc_list = store_info.get("dlc", [])
+            dlc_count_store = len(dlc_list)
+            release_date_thai = format_release_date(store_info.get('release_date', {}).get('date', 'ไม่ระบุ'))
+            drm_notice = store_info.get("drm_notice", "")
+            has_denuvo = "denuvo" in drm_notice.lower()
+    except (*HTTP_ERRORS, ValueError) as e:
+        print(f"Steam Store fetch error: {e}")
+
+    if not fetched:
+        # Steam is failing; an expired entry beats "app not found"
+        stale = steam_cache.get_stale(app_id)
+        if stale is not None:
+            return stale
+
+    steam_data = {
+        'name': name_store,
+        'developer': store_info.get('developer', 'ไม่ระบุ') if store_success else 'ไม่ระบุ',
+        'image': header_image_store,
+        'dlc_count': dlc_count_store,
+        'release_date': release_date_thai,
+        'has_denuvo': has_denuvo,
+    }
+    if fetched:
+        steam_cache.set(app_id, steam_data, negative=not store_success)
+    return steam_data
+
+def ruled_out(app_id: str) -> bool:
+    return any(gate(app_id) for gate in file_gates)
+
+async def probe_file(app_id: str) -> ProbeResult | None:
+    if ruled_out(app_id):
+        return None
+    await file_status_cache.load(app_id, workers)
+    cached = file_status_cache.get(app_id, MISSING)
+    if cached is not MISSING:
+        return cached
+    refresh = functools.partial(fetch_file_probe, app_id)
+    stale = file_status_cache.get_stale(app_id)
+    if stale is not None:
+        # Only found files are served stale; a stale "no file" is checked again before answering
+        file_probes.start(app_id, refresh)
+        return stale
+    return await file_probes.run(app_id, refresh)
+
+async def fetch_file_probe(app_id: str) -> ProbeResult | None:
+    url = f"{DEVGOD_BASE_URL}{app_id}"
+    try:
+        probe = await http.probe(url, timeout=10)
+    except HTTP_ERRORS:
+        return file_status_cache.get_stale(app_id)
+    if probe.unavailable:
+        # Down or throttled: not a "no file" answer, so nothing is cached
+        return file_status_cache.get_stale(app_id)
+
+    result = probe if probe.ok and "content-disposition" in probe.headers else None
+    file_status_cache.set(app_id, result, negative=result is None)
+    return result
+
+@traced("file_status")
+async def check_file_status(app_id: str) -> str | None:
+    probe = await probe_file(app_id)
+    return probe.url if probe else None
+
+def peek_file_probe(app_id: str) -> tuple[ProbeResult | None, asyncio.Task | None]:
+    probe, refresh = peek(file_status_cache, file_probes, app_id, functools.partial(fetch_file_probe, app_id))
+    if probe is MISSING and ruled_out(app_id):
+        return None, None
+    if probe is None and refresh:
+        # Same rule as probe_file(): a stale "no file" is checked again, not served
+        return MISSING, None
+    return probe, refresh
+
+async def refreshed_file_url(refresh: asyncio.Task) -> str | None:
+    probe = await refresh
+    return probe.url if probe else None
+
+def peek_file_status(app_id: str) -> tuple[str | None, asyncio.Task | None]:
+    """check_file_status() from the cache only; the refresh task resolves to the fresh URL."""
+    probe, refresh = peek_file_probe(app_id)
+    if probe is MISSING:
+        return MISSING, None
+    return probe.url if probe else None, refresh and asyncio.ensure_future(refreshed_file_url(refresh))
+
+def format_size(size: int | None) -> str:
+    if size is None:
+        return "ไม่ทราบขนาด"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+@traced("link_status")
+async def get_link_status(url: str) -> dict:
+    cached = link_status_cache.get(url)
+    if cached is not None:
+        return cached
+    return await link_probes.run(url, functools.partial(fetch_link_status, url))
+
+async def fetch_link_status(url: str) -> dict:
+    host = urlsplit(url).netloc
+    limit = link_host_limits.setdefault(host, asyncio.Semaphore(LINK_PROBE_PER_HOST))
+    async with limit:
+        try:
+            probe = await http.probe(url, timeout=10)
+        except HTTP_ERRORS as e:
+            print(f"Link probe error for {url}: {e}")
+            return {'alive': None, 'name': None, 'size': None}
+
+    if probe.unavailable:
+        # The bypass host itself is struggling or throttling us; say nothing about the file and cache nothing
+        return {'alive': None, 'name': None, 'size': None}
+    status = {
+        'alive': probe.ok,
+        'name': content_disposition_filename(probe.headers.get("Content-Disposition")),
+        'size': probe.size,
+    }
+    link_status_cache.set(url, status, negative=not probe.ok)
+    return status
+
+async def warm_app(app_id: str):
+    # Steam entries live for hours, so only refresh those about to expire. Both go through
+    # the coalescers so a command asking for the same app meanwhile shares the request
+    if steam_cache.ttl_remaining(app_id) < 2 * PREFETCH_INTERVAL:
+        await steam_requests.run(app_id, functools.partial(fetch_steam_info, app_id))
+    if ruled_out(app_id):
+        # Commands skip the file server for these too (see probe_file)
+        return
+    probe = await file_probes.run(app_id, functools.partial(fetch_file_probe, app_id))
+    if probe:
+        for warm in probe_warmers:
+            await warm(probe)
+
+# keeps Steam info, file probes (and whatever probe_warmers add) warm for the hot set; started from on_ready
+prefetcher = Prefetcher(warm_app, seed_ids=PREFETCH_APP_IDS, hot_size=PREFETCH_HOT_SIZE, interval=PREFETCH_INTERVAL,
+                        store=shared_cache, pool=workers,
+                        name="shards-" + ",".join(map(str, SHARD_IDS)) if SHARD_IDS else "primary")
+# The other shard processes hand their command history to the primary's prefetcher through the store
+prefetch_history_publisher = PeriodicTask(prefetcher.publish, PREFETCH_INTERVAL, "Prefetch history")
+
+async def purge_shared_cache():
+    removed = await workers.run(shared_cache.purge)
+    if removed:
+        print(f"Shared cache purged: {removed} expired entries")
+
+shared_cache_purger = PeriodicTask(purge_shared_cache, SHARED_CACHE_PURGE_INTERVAL, "Shared cache purge")
+
+def parse_steam_app_list(body: bytes | str) -> list[tuple[int, str]]:
+    apps = loads_in_pieces(body).get('applist', {}).get('apps', [])
+    return [(app['appid'], app['name']) for app in apps if app.get('appid') and app.get('name')]
+
+async def fetch_steam_app_list() -> list[tuple[int, str]]:
+    # Shard processes other than the primary reuse the body it fetched; the store holds it as a string
+    row = None
+    if not PRIMARY_PROCESS and shared_cache is not None:
+        row = await workers.run(shared_cache.get, "app_list", "steam")
+    try:
+        if row is not None:
+            body = row[0]
+        else:
+            response = await http.get(STEAM_APP_LIST_URL, timeout=30)
+            response.raise_for_status()
+            body = response.body.decode()
+            if shared_cache is not None:
+                await workers.run(shared_cache.set, "app_list", "steam", body, 2 * APP_INDEX_REFRESH_INTERVAL)
+        # Several MB of JSON: a plain json.loads holds the GIL throughout, even on a worker,
+        # so it is decoded in pieces there and the loop keeps getting turns
+        return await workers.run(parse_steam_app_list, body)
+    except (*HTTP_ERRORS, ValueError, AttributeError) as e:
+        print(f"Steam app list fetch error: {e}")
+        return []
+
+async def refresh_app_index():
+    global app_index
+    # Sources read SQLite (the catalog); run them on a worker like the index build
+    entries = [entry for source in app_name_sources for entry in await workers.run(source)]
+    entries += await fetch_steam_app_list()
+    if entries:
+        # Building ~200k titles takes a few seconds; keep it off the gateway loop
+        app_index = await workers.run(AppNameIndex, entries)
+
+# name search for /gen and its autocomplete, rebuilt from app_name_sources and the Steam app list
+app_index = AppNameIndex()
+app_index_refresher = PeriodicTask(refresh_app_index, APP_INDEX_REFRESH_INTERVAL, "App name index")
+
+# --- 3. Embed Builders ---
+def dlc_note(app_id: str, dlc_count: int) -> str:
+    for note in dlc_notes:
+        text = note(app_id, dlc_count)
+        if text:
+            return text
+    return "(ไม่ทราบจำนวนDLCที่พบและสูญหาย)"
+
+def add_steam_fields(embed: nextcord.Embed, app_id: str, steam_data, details: bool = False):
+    """The game block every per-app embed opens with; ``details`` adds the release date and store links (/gen)."""
+    if steam_data is PENDING:
+        embed.add_field(name="สถานะ Steam", value="⏳ กำลังโหลดข้อมูลเกม...", inline=False)
+        embed.set_footer(text="Discord • DEV/g0d • Solus")
+    elif steam_data:
+        embed.add_field(name="ชื่อแอป", value=steam_data['name'], inline=False)
+        if steam_data['developer'] != 'ไม่ระบุ':
+            embed.add_field(name="ผู้พัฒนา", value=steam_data['developer'], inline=False)
+        if steam_data['dlc_count'] > 0:
+            embed.add_field(
+                name="",
+                value=f"📦 สถานะ DLC: ✅ พบ DLC\n{dlc_note(app_id, steam_data['dlc_count'])}",
+                inline=False
+            )
+        else:
+            embed.add_field(
+                name="",
+                value="📦 สถานะ DLC: ℹ️ ไม่พบ DLC",
+                inline=False
+            )
+        if details:
+            embed.add_field(name="วันวางจำหน่าย", value=steam_data['release_date'], inline=False)
+            links_value = f"[Steam Store](https://store.steampowered.com/app/{app_id}/) | [SteamDB](https://steamdb.info/app/{app_id}/)"
+            if steam_data['has_denuvo']:
+                links_value += "\n:warning: ตรวจพบการป้องกัน Denuvo"
+            embed.add_field(name="Links", value=links_value, inline=False)
+
+        if steam_data['image']:
+            embed.set_image(url=steam_data['image'])
+            embed.set_footer(text="Discord • DEV/g0d • Solus")
+    else:
+        embed.add_field(name="สถานะ Steam", value="ไม่พบข้อมูลเกมบน Steam", inline=False)
+        embed.set_footer(text="Discord • DEV/g0d • Solus")
+
+def build_gen_embed(app_id: str, steam_data, file_url_200) -> nextcord.Embed:
+    file_pending = file_url_200 is PENDING
+    embed = nextcord.Embed(
+        title=f"🔎 ข้อมูล Steam App ID: {app_id}",
+        color=0xAAAAAA if file_pending else 0x00FF00 if file_url_200 else 0xFF0000
+    )
+    add_steam_fields(embed, app_id, steam_data, details=True)
+        
+    if file_pending:
+        embed.add_field(name="📥 สถานะไฟล์: ⏳ กำลังตรวจสอบ...", value="", inline=False)
+    elif file_url_200:
+        embed.add_field(
+            name="", 
+            value=f"**📥 สถานะไฟล์:** ✅ [**พร้อมดาวน์โหลด↗**]({file_url_200})", 
+            inline=False
+        )
+    elif upstream_breakers.is_open(FILE_SERVER_HOST):
+        embed.add_field(name=f"📥 สถานะไฟล์: {FILE_SERVER_DOWN_NOTE}", value="", inline=False)
+    else:
+        embed.add_field(
+            name="📥 สถานะไฟล์: ❌ ไม่พบไฟล์", 
+            value="", 
+            inline=False
+        )
+    
+    return embed
+
+def build_bulk_embeds(app_ids: list[str], results: list[tuple[dict, str | None]]) -> list[nextcord.Embed]:
+    found = sum(1 for _, file_url_200 in results if file_url_200)
+    pages = []
+    for start in range(0, len(app_ids), BULK_PAGE_SIZE):
+        embed = nextcord.Embed(
+            title=f"🔎 ผลการค้นหา {len(app_ids)} App ID",
+            description=f"📥 พร้อมดาวน์โหลด {found}/{len(app_ids)}",
+            color=0x00FF00 if found else 0xFF0000
+        )
+        for app_id, (steam_data, file_url_200) in zip(app_ids[start:start + BULK_PAGE_SIZE], results[start:start + BULK_PAGE_SIZE]):
+            links_value = f"`{app_id}` | [Steam Store](https://store.steampowered.com/app/{app_id}/)"
+            if file_url_200:
+                links_value += f" | ✅ [**พร้อมดาวน์โหลด↗**]({file_url_200})"
+            elif upstream_breakers.is_open(FILE_SERVER_HOST):
+                links_value += " | ⚠️ ตรวจสอบไม่ได้"
+            else:
+                links_value += " | ❌ ไม่พบไฟล์"
+            embed.add_field(name=steam_data['name'], value=links_value, inline=False)
+        embed.set_footer(text="Discord • DEV/g0d • Solus")
+        pages.append(embed)
+    return pages
+
+def build_download_embed(converted_urls: list[tuple[str, str, str, str]], statuses: list[dict] | None = None) -> nextcord.Embed:
+    checking = statuses is PENDING
+    if checking:
+        statuses = None
+    alive = [status['alive'] is not False for status in statuses] if statuses is not None else [True] * len(converted_urls)
+    embed = nextcord.Embed(
+        title="📥 Bypass Download Limiter",
+        color=0xAAAAAA if checking else 0x00FF00 if any(alive) else 0xFF0000
+    )
+
+    if converted_urls:
+        for index, (converted_url, original_url, file_id, flag) in enumerate(converted_urls):
+            status = statuses[index] if statuses is not None else None
+            if status is None:
+                value = f"🔗 {flag} [/{file_id}]({original_url}) | [Bypass ↗]({converted_url})"
+            elif status['alive'] is False:
+                value = f"❌ {flag} [/{file_id}]({original_url}) | ไม่พบไฟล์หรือลิงก์หมดอายุ"
+            elif status['alive'] is None:
+                value = f"⚠️ {flag} [/{file_id}]({original_url}) | [Bypass ↗]({converted_url}) (ตรวจสอบไม่ได้)"
+            else:
+                value = f"✅ {flag} [/{file_id}]({original_url}) | [Bypass ↗]({converted_url})"
+                value += f"\n📄 {status['name'] or file_id} • {format_size(status['size'])}"
+            embed.add_field(name="", value=value, inline=False)
+        if checking:
+            embed.add_field(name="", value="⏳ กำลังตรวจสอบลิงก์...", inline=False)
+    else:
+        embed.add_field(
+            name="",
+            value="❌ รองรับเฉพาะลิงก์ gofile และ pixeldrain เท่านั้น",
+            inline=False
+        )
+
+    embed.set_footer(text="Discord • DEV/g0d • GameDrive.Org")
+    return embed
+
+def build_bulk_pending_embed(app_ids: list[str]) -> nextcord.Embed:
+    embed = nextcord.Embed(title=f"🔎 ผลการค้นหา {len(app_ids)} App ID", description="⏳ กำลังค้นหา...", color=0xAAAAAA)
+    embed.set_footer(text="Discord • DEV/g0d • Solus")
+    return embed
+
+# --- 4. Command Pipeline ---
+async def authorize(interaction: nextcord.Interaction) -> bool:
+    if interaction.channel_id not in ALLOWED_CHANNEL_IDS:
+        await interaction.response.send_message("ไม่มีสิทธิในการใช้งาน กรุณาใช้คำสั่งที่ <#1422199765818413116>", ephemeral=True)
+        return False
+    return await admit(interaction)
+
+async def admit(interaction: nextcord.Interaction) -> bool:
+    """Check the user and channel buckets and upstream backpressure; answer right away if the command can't run."""
+    # Checked first so a command turned away for load costs the user no token
+    queued = upstream_limiter.queued
+    if queued >= UPSTREAM_QUEUE_MAX:
+        await interaction.response.send_message(f"⏳ ระบบกำลังยุ่ง มีคำขอรอดำเนินการอยู่ {queued} รายการ กรุณาลองใหม่อีกครั้งในภายหลัง", ephemeral=True)
+        return False
+
+    user_id = interaction.user.id if interaction.user else None
+    retry_after = user_limiter.try_acquire(user_id)
+    if not retry_after:
+        retry_after = channel_limiter.try_acquire(interaction.channel_id)
+        if retry_after:
+            # The command does not run, so the user's token goes back
+            user_limiter.refund(user_id)
+    if retry_after:
+        await interaction.response.send_message(f"⏳ ใช้คำสั่งถี่เกินไป กรุณาลองใหม่ในอีก {math.ceil(retry_after)} วินาที", ephemeral=True)
+        return False
+    return True
+
+def parse_app_id_or_name(input_value: str) -> str:
+    app_id = extract_app_id(input_value) or app_index.resolve(input_value)
+    if not app_id:
+        raise CommandRejected("ไม่พบ App ID ในข้อมูลที่ให้มา!")
+    return app_id
+
+def parse_numeric_app_id(app_id: str) -> str:
+    if not app_id.isdigit():
+        raise CommandRejected("App ID ต้องเป็นตัวเลขเท่านั้น!")
+    return app_id
+
+def parse_app_id_list(inputs: str) -> list[str]:
+    app_ids = extract_app_ids(inputs)
+    if not app_ids:
+        raise CommandRejected("ไม่พบ App ID ในข้อมูลที่ให้มา!")
+    if len(app_ids) > BULK_MAX_IDS:
+        raise CommandRejected(f"ใส่ได้สูงสุด {BULK_MAX_IDS} รายการต่อครั้ง (พบ {len(app_ids)} รายการ เกินมา {len(app_ids) - BULK_MAX_IDS} รายการ)")
+    return app_ids
+
+def parse_download_urls(urls: str) -> list[tuple[str, str, str, str]]:
+    converted_urls = []
+    for url in (url.strip() for url in urls.split(",")):
+        converted_url, original_url, file_id, flag = convert_download_url(url, DOWNLOAD_BYPASS_URLS)
+        if converted_url and original_url and file_id and flag:
+            converted_urls.append((converted_url, original_url, file_id, flag))
+    return converted_urls
+
+async def resolve_bulk(app_ids: list[str]) -> list[tuple[dict, str | None]]:
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def resolve(app_id: str):
+        async with semaphore:
+            return await asyncio.gather(get_steam_info(app_id), check_file_status(app_id))
+
+    return await asyncio.gather(*(resolve(app_id) for app_id in app_ids))
+
+async def get_link_statuses(converted_urls: list[tuple[str, str, str, str]]) -> list[dict] | None:
+    if not converted_urls:
+        return None
+    # Every link is probed at once, so a long paste costs about one probe's latency
+    return await asyncio.gather(*(get_link_status(converted_url) for converted_url, *_ in converted_urls))
+
+def render_bulk(author_id: int | None, app_ids: list[str], results: list[tuple[dict, str | None]]):
+    if results is PENDING:
+        return build_bulk_pending_embed(app_ids)
+    pages = build_bulk_embeds(app_ids, results)
+    if len(pages) > 1:
+        return {'embed': pages[0], 'view': EmbedPaginator(pages, author_id=author_id)}
+    return pages[0]
+
+# Every slash command runs through this: channel and rate-limit checks, input parsing, cached or
+# concurrent lookups (with a partial embed when slow), rendering and the followup, timed per stage
+pipeline = CommandPipeline(authorize, tracer, record=prefetcher.record, partial_delay=PARTIAL_EMBED_DELAY,
+                           stale_while_revalidate=STALE_WHILE_REVALIDATE)
+steam_lookup = Lookup(get_steam_info, peek_steam_info)
+file_status_lookup = Lookup(check_file_status, peek_file_status)
+
+
+# --- 5. Shared Slash Commands ---
+@bot.slash_command(name="gen", description="ค้นหาไฟล์จาก App ID หรือ URL")
+async def gen(interaction: nextcord.Interaction, input_value: str = nextcord.SlashOption(
+    name="input",
+    description="ใส่ App ID, URL หรือชื่อเกม (เช่น 730 หรือ https://store.steampowered.com/app/730/)",
+    required=True
+)):
+    await pipeline.run(interaction, "gen", build_gen_embed, [steam_lookup, file_status_lookup],
+                       parse=functools.partial(parse_app_id_or_name, input_value), record=True)
+
+@gen.on_autocomplete("input_value")
+async def gen_autocomplete(interaction: nextcord.Interaction, input_value: str):
+    if not input_value or extract_app_id(input_value):
+        await interaction.response.send_autocomplete([])
+        return
+    # Choice names are capped at 100 characters by Discord
+    choices = {f"{name} ({app_id})"[:100]: str(app_id) for app_id, name in app_index.search(input_value, limit=25)}
+    await interaction.response.send_autocomplete(choices)
+
+@bot.slash_command(name="gen_bulk", description="ค้นหาไฟล์จากหลาย App ID หรือ URL พร้อมกัน")
+async def gen_bulk(interaction: nextcord.Interaction, inputs: str = nextcord.SlashOption(
+    name="inputs",
+    description=f"ใส่ App ID หรือ URL หลายรายการ คั่นด้วยช่องว่างหรือ , (สูงสุด {BULK_MAX_IDS} รายการ)",
+    required=True
+)):
+    author_id = interaction.user.id if interaction.user else None
+    await pipeline.run(interaction, "gen_bulk", functools.partial(render_bulk, author_id), [Lookup(resolve_bulk)],
+                       parse=functools.partial(parse_app_id_list, inputs), record=True)
+
+@bot.slash_command(name="download", description="Bypass สำหรับ gofile หรือ pixeldrain")
+async def download(interaction: nextcord.Interaction, urls: str = nextcord.SlashOption(
+    name="urls",
+    description="ใส่ลิงก์ gofile หรือ pixeldrain (คั่นด้วยเครื่องหมาย , หากมีหลายลิงก์)",
+    required=True
+), validate: bool = nextcord.SlashOption(
+    name="validate",
+    description="ตรวจสอบว่าไฟล์ยังอยู่ พร้อมแสดงชื่อและขนาดไฟล์ (ค่าเริ่มต้น: เปิด)",
+    required=False,
+    default=True
+)):
+    await pipeline.run(interaction, "download", build_download_embed, [Lookup(get_link_statuses)] if validate else [],
+                       parse=functools.partial(parse_download_urls, urls))
+
+# --- 6. Health & Metrics Server ---
+health_server = HealthServer(bot, int(os.environ.get("PORT", 8080)), breakers=upstream_breakers,
+                             max_latency=HEALTH_MAX_LATENCY, grace=HEALTH_GRACE)
+health_server.register("gateway", lambda: {'latency_seconds': bot.latency, 'guilds': len(bot.guilds), 'ready': bot.is_ready()})
+health_server.register("shard", lambda: {shard_id: {'latency_seconds': latency} for shard_id, latency in bot.latencies}, label="shard")
+health_server.register("steam_cache", steam_cache.stats)
+health_server.register("steam_requests", steam_requests.stats)
+health_server.register("file_status_cache", file_status_cache.stats)
+health_server.register("file_probes", file_probes.stats)
+health_server.register("link_status_cache", link_status_cache.stats)
+health_server.register("link_probes", link_probes.stats)
+health_server.register("user_limiter", user_limiter.stats)
+health_server.register("channel_limiter", channel_limiter.stats)
+health_server.register("upstream", upstream_limiter.stats)
+health_server.register("upstream_queue", lambda: {host: {'queued': queued} for host, queued in upstream_limiter.stats()['queued_by_host'].items()}, label="host")
+health_server.register("breaker", upstream_breakers.stats, label="host")
+health_server.register("workers", workers.stats)
+health_server.register("prefetch", prefetcher.stats)
+health_server.register("app_index", lambda: {'size': len(app_index), **app_index_refresher.stats()})
+if shared_cache is not None:
+    health_server.register("shared_cache", shared_cache.stats)
+health_server.register("pipeline", pipeline.stats)
+health_server.register("tracing", tracer.stats)
+health_server.register_renderer(tracer.render_prometheus)
+
+# --- 7. Discord Events ---
+@bot.event
+async def on_ready():
+    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
+    print('Bot is ready and running!')
+    if PRIMARY_PROCESS:
+        prefetcher.start()
+        if shared_cache is not None:
+            shared_cache_purger.start()
+    elif shared_cache is not None:
+        prefetch_history_publisher.start()
+    app_index_refresher.start()
+    for refresher in refreshers:
+        refresher.start()
+    await bot.change_presence(activity=nextcord.Activity(type=nextcord.ActivityType.watching, name="24/7 for Manifest"))
+
+# --- 8. Main Execution ---
+async def main():
+    # Health server, gateway and HTTP client all share the loop nextcord was created with
+    await health_server.start()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            bot.loop.add_signal_handler(signum, lambda: asyncio.ensure_future(bot.close()))
+    try:
+        await bot.start(DISCORD_BOT_TOKEN)
+    finally:
+        await bot.close()
+        await health_server.stop()
+        await http.close()
+        workers.shutdown()
+        if shared_cache is not None:
+            shared_cache.close()
+
+def run(script: str):
+    """Entry point of a bot script; ``script`` is its __file__, relaunched once per slice of shards."""
+    if SHARD_PROCESSES > 1:
+        sys.exit(launch_shard_processes(script, SHARD_COUNT or SHARD_PROCESSES, SHARD_PROCESSES,
+                                        SHARED_CACHE_PATH or os.path.join(".cache", "shared.sqlite3")))
+    try:
+        if not DISCORD_BOT_TOKEN or DISCORD_BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
+            print("FATAL ERROR: Please set the DISCORD_BOT_TOKEN environment variable or change the default value.")
+        else:
+            bot.loop.run_until_complete(main())
+    except nextcord.errors.LoginFailure:
+        print("FATAL ERROR: Invalid Discord Bot Token. Please check your token.")
+    except Exception as e:
+        print(f"An error occurred while running the bot: {e}")
@@ -0,0 +1,143 @@
+import json
+import math
+import time
+
+from aiohttp import web
+
+
+def prometheus_name(*parts: str) -> str:
+    return "_".join(part.strip("_") for part in parts if part).replace(".", "_").replace("-", "_")
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def numeric(value) -> float | None:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)) and not math.isnan(value):
+        return float(value)
+    return None
+
+
+class HealthServer:
+    """Liveness, readiness and Prometheus metrics served from the bot's own event loop.
+
+    ``/healthz`` fails once the gateway has been unhealthy (closed, or no
+    heartbeat ACK within ``max_latency``) for longer than ``grace`` seconds,
+    so the orchestrator restarts the process on a real failure rather than a
+    blip. ``/readyz`` reports whether every shard is connected and answering
+    heartbeats, along with the state of the upstream circuit breakers.
+    ``/metrics`` flattens the numeric fields of every registered stats()
+    source.
+    """
+
+    def __init__(self, bot, port: int, breakers=None, namespace: str = "bot",
+                 max_latency: float = 10.0, grace: float = 120.0):
+        self.bot = bot
+        self.port = port
+        self.breakers = breakers
+        self.namespace = namespace
+        self.max_latency = max_latency
+        self.grace = grace
+        self.started_at = time.monotonic()
+        self.unhealthy_since: float | None = None
+        self._sources: list[tuple[str, object, str | None]] = []
+        self._renderers: list = []
+        self._runner: web.AppRunner | None = None
+
+    def register(self, name: str, stats, label: str | None = None):
+        """Expose stats() under ``name``; with ``label``, stats() maps label values to stats dicts."""
+        self._sources.append((name, stats, label))
+
+    def register_renderer(self, render):
+        """Append render(namespace) -> list of exposition lines to /metrics (histograms and the like)."""
+        self._renderers.append(render)
+
+    def shard_latencies(self) -> dict[int, float]:
+        return {shard_id: latency for shard_id, latency in getattr(self.bot, "latencies", [(0, self.bot.latency)])}
+
+    def gateway_ok(self) -> bool:
+        if self.bot.is_closed() or not self.bot.is_ready():
+            return False
+        latencies = self.shard_latencies().values()
+        return bool(latencies) and all(math.isfinite(latency) and latency <= self.max_latency for latency in latencies)
+
+    def live(self) -> bool:
+        now = time.monotonic()
+        if self.gateway_ok():
+            self.unhealthy_since = None
+            return True
+        if self.unhealthy_since is None:
+            # Startup counts as unhealthy from the moment the server came up
+            self.unhealthy_since = self.started_at if not self.bot.is_ready() else now
+        return now - self.unhealthy_since < self.grace
+
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="Discord Bot is running and ready to serve!")
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        live = self.live()
+        return web.json_response({'status': 'ok' if live else 'failing'}, status=200 if live else 503)
+
+    async def readyz(self, request: web.Request) -> web.Response:
+        ready = self.gateway_ok()
+        breakers = self.breakers.stats() if self.breakers is not None else {}
+        open_upstreams = sorted(host for host, stats in breakers.items() if stats['state'] != "closed")
+        body = {
+            'ready': ready,
+            'degraded': bool(open_upstreams),
+            'open_upstreams': open_upstreams,
+            'shards': {str(shard_id): latency if math.isfinite(latency) else None
+                       for shard_id, latency in self.shard_latencies().items()},
+        }
+        return web.Response(text=json.dumps(body), content_type="application/json", status=200 if ready else 503)
+
+    def collect(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        for name, stats, label in self._sources:
+            try:
+                groups = stats().items() if label else [(None, stats())]
+            except Exception as e:
+                print(f"Metrics source {name} failed: {e}")
+                continue
+            for label_value, fields in groups:
+                labels = {label: label_value} if label else {}
+                for field, value in fields.items():
+                    value = numeric(value)
+                    if value is not None:
+                        samples.append((prometheus_name(self.namespace, name, field), labels, value))
+        return samples
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        lines = []
+        for metric, labels, value in self.collect():
+            rendered = "+Inf" if value == math.inf else repr(value)
+            lines.append(f"{metric}{prometheus_labels(labels)} {rendered}")
+        for render in self._renderers:
+            lines.extend(render(self.namespace))
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain", charset="utf-8",
+                            headers={"Cache-Control": "no-store"})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self.home)
+        app.router.add_get("/healthz", self.healthz)
+        app.router.add_get("/readyz", self.readyz)
+        app.router.add_get("/metrics", self.metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "0.0.0.0", self.port).start()
+        print(f"Health server listening on port {self.port}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,255 @@
+import asyncio
+import contextlib
+import functools
+import json
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from resilience import CircuitOpenError, hedged
+
+# Errors the helpers treat the same way the old code treated requests.RequestException;
+# a refused call to a tripped upstream is handled like any other failed request
+HTTP_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError)
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def upstream_unavailable(status: int) -> bool:
+    """The host is down or throttling us (5xx, 429); the answer says nothing about the resource."""
+    return status >= 500 or status == 429
+
+
+class HttpStatusError(aiohttp.ClientError):
+    pass
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    url: str
+    headers: CIMultiDictProxy
+    body: bytes
+
+    @property
+    def total_size(self) -> int | None:
+        return parse_total_size(self.status, self.headers)
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpStatusError(f"HTTP {self.status} for {self.url}")
+
+
+@dataclass
+class ProbeResult:
+    status: int
+    url: str
+    headers: CIMultiDictProxy
+    size: int | None
+    etag: str | None
+    accept_ranges: bool
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (200, 206)
+
+    @property
+    def unavailable(self) -> bool:
+        return upstream_unavailable(self.status)
+
+    def to_dict(self) -> dict:
+        """JSON-friendly form, for caches shared between processes."""
+        return {
+            'status': self.status,
+            'url': self.url,
+            'headers': dict(self.headers),
+            'size': self.size,
+            'etag': self.etag,
+            'accept_ranges': self.accept_ranges,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProbeResult":
+        return cls(**{**data, 'headers': CIMultiDictProxy(CIMultiDict(data['headers']))})
+
+
+def parse_total_size(status: int, headers) -> int | None:
+    # "Content-Range: bytes 0-0/1234" carries the full size of a ranged response
+    if status == 206:
+        content_range = headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+class HttpClient:
+    """Single aiohttp session shared by every helper.
+
+    The connector keeps a bounded pool of keep-alive connections per host, so
+    Steam, pythonanywhere and Morrenus each reuse their TLS connections instead
+    of paying a handshake on every command. When ``limiter`` is set (anything
+    with an async ``acquire(host)``), each request first waits for its host's
+    turn. When ``breakers`` is set (a ``resilience.CircuitBreakers``), calls to
+    a host whose circuit is open fail fast with CircuitOpenError, and every
+    outcome is reported back: errors, 5xx and 429 count as failures.
+    ``observer(host, seconds)``, when set, is told how long each call took
+    once it had its rate-limit token. ``get_hedged`` also needs the limiter's
+    ``available(host)``.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, keepalive_timeout: float = 30.0,
+                 limiter=None, breakers=None, observer=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.limiter = limiter
+        self.breakers = breakers
+        self.observer = observer
+        self._session: aiohttp.ClientSession | None = None
+
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the loop nextcord is running on
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+        return self._session
+
+    async def _throttle(self, url: str) -> str:
+        host = urlsplit(url).hostname or ""
+        # Checked before queueing so an open circuit never waits for a rate-limit token
+        if self.breakers is not None:
+            self.breakers.before(host)
+        if self.limiter is not None:
+            await self.limiter.acquire(host)
+        return host
+
+    def _record(self, host: str, status: int | None, started: float):
+        if self.observer is not None:
+            self.observer(host, time.perf_counter() - started)
+        if self.breakers is not None:
+            self.breakers.record(host, status is not None and not upstream_unavailable(status))
+
+    async def request(self, method: str, url: str, *, timeout: float, headers: dict | None = None,
+                      allow_redirects: bool = True, read_body: bool = True) -> HttpResponse:
+        host = await self._throttle(url)
+        return await self._send(method, url, host, timeout=timeout, headers=headers,
+                                allow_redirects=allow_redirects, read_body=read_body)
+
+    async def _send(self, method: str, url: str, host: str, *, timeout: float, headers: dict | None = None,
+                    allow_redirects: bool = True, read_body: bool = True) -> HttpResponse:
+        started = time.perf_counter()
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        try:
+            async with self.session().request(method, url, headers=headers, timeout=client_timeout,
+                                              allow_redirects=allow_redirects) as response:
+                body = await response.read() if read_body else b""
+        except HTTP_ERRORS:
+            self._record(host, None, started)
+            raise
+        self._record(host, response.status, started)
+        return HttpResponse(response.status, str(response.url), response.headers, body)
+
+    async def get(self, url: str, *, timeout: float, headers: dict | None = None,
+                  allow_redirects: bool = True, read_body: bool = True) -> HttpResponse:
+        return await self.request("GET", url, timeout=timeout, headers=headers,
+                                  allow_redirects=allow_redirects, read_body=read_body)
+
+    async def get_hedged(self, url: str, *, delay: float, timeout: float,
+                         headers: dict | None = None) -> HttpResponse:
+        """GET url, racing a second request if the first has not answered ``delay`` seconds after it was sent.
+
+        The clock starts once the first request has its rate-limit token, so
+        time spent queued never triggers a hedge, and no hedge is sent while
+        the host has no spare token.
+        """
+        host = await self._throttle(url)
+        first = functools.partial(self._send, "GET", url, host, timeout=timeout, headers=headers)
+        hedge = functools.partial(self.get, url, timeout=timeout, headers=headers)
+        allow = None if self.limiter is None else functools.partial(self.limiter.available, host)
+        return await hedged(first, delay, hedge=hedge, allow=allow)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, url: str, *, timeout: float, headers: dict | None = None):
+        """GET url and yield the live aiohttp response so the body can be consumed in chunks."""
+        host = await self._throttle(url)
+        started = time.perf_counter()
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        recorded = False
+        try:
+            async with self.session().get(url, headers=headers, timeout=client_timeout) as response:
+                # Timed to the response headers; the body is consumed by the caller
+                self._record(host, response.status, started)
+                recorded = True
+                yield response
+        except HTTP_ERRORS:
+            if not recorded:
+                self._record(host, None, started)
+            raise
+
+    async def get_range(self, url: str, start: int, end: int | None = None, *, timeout: float,
+                        headers: dict | None = None) -> HttpResponse:
+        """GET bytes start..end (inclusive); a negative start asks for the last -start bytes.
+
+        Callers must check for a 200: servers that ignore Range send the whole body.
+        """
+        spec = f"bytes={start}" if start < 0 else f"bytes={start}-{'' if end is None else end}"
+        return await self.get(url, timeout=timeout, headers={**(headers or {}), "Range": spec})
+
+    async def probe(self, url: str, *, timeout: float, headers: dict | None = None) -> ProbeResult:
+        """Resolve redirects and read the target's metadata without transferring the body.
+
+        Tries HEAD first. Hosts that reject HEAD (405/501, or 403 from URLs
+        signed for GET only) get a one-byte ``Range: bytes=0-0`` GET instead.
+        """
+        host = await self._throttle(url)
+        started = time.perf_counter()
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        try:
+            async with self.session().head(url, headers=headers, timeout=client_timeout,
+                                           allow_redirects=True) as response:
+                result = self._probe_result(response)
+            if result.status in (403, 405, 501):
+                range_headers = {**(headers or {}), "Range": "bytes=0-0"}
+                async with self.session().get(url, headers=range_headers, timeout=client_timeout,
+                                              allow_redirects=True) as response:
+                    if response.status == 206:
+                        # A single byte; reading it lets the connection go back to the pool
+                        await response.read()
+                    result = self._probe_result(response)
+        except HTTP_ERRORS:
+            self._record(host, None, started)
+            raise
+        self._record(host, result.status, started)
+        return result
+
+    @staticmethod
+    def _probe_result(response: aiohttp.ClientResponse) -> ProbeResult:
+        headers = response.headers
+        return ProbeResult(
+            status=response.status,
+            url=str(response.url),
+            headers=headers,
+            size=parse_total_size(response.status, headers),
+            etag=headers.get("ETag"),
+            accept_ranges=response.status == 206 or headers.get("Accept-Ranges", "").lower() == "bytes",
+        )
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http = HttpClient()
@@ -0,0 +1,37 @@
+import nextcord
+
+
+class EmbedPaginator(nextcord.ui.View):
+    """Previous/next buttons that flip one message through a list of embeds."""
+
+    def __init__(self, pages: list[nextcord.Embed], author_id: int | None = None, timeout: float = 300):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.author_id = author_id
+        self.index = 0
+        for number, page in enumerate(pages, start=1):
+            footer = page.footer.text or ""
+            page.set_footer(text=f"{footer} • หน้า {number}/{len(pages)}" if footer else f"หน้า {number}/{len(pages)}")
+        self._sync_buttons()
+
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.pages) - 1
+
+    async def interaction_check(self, interaction: nextcord.Interaction) -> bool:
+        # Only whoever ran the command flips the pages
+        return self.author_id is None or interaction.user is None or interaction.user.id == self.author_id
+
+    async def _show(self, interaction: nextcord.Interaction):
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @nextcord.ui.button(emoji="◀️", style=nextcord.ButtonStyle.secondary)
+    async def previous_page(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        self.index = max(0, self.index - 1)
+        await self._show(interaction)
+
+    @nextcord.ui.button(emoji="▶️", style=nextcord.ButtonStyle.secondary)
+    async def next_page(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        self.index = min(len(self.pages) - 1, self.index + 1)
+        await self._show(interaction)
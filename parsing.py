@@ -0,0 +1,162 @@
+import datetime
+import functools
+import json
+import re
+from urllib.parse import unquote
+
+# Hosts whose links carry a Steam app_id right after the prefix
+APP_URL_PREFIXES = (
+    r"steamdb\.info/app/",
+    r"store\.steampowered\.com/app/",
+    r"steamcommunity\.com/app/",
+    r"s\.team/a/",
+)
+APP_URL_PATTERN = re.compile(f"(?:{'|'.join(APP_URL_PREFIXES)})(\\d+)")
+# App URLs or bare IDs standing alone between spaces/commas, found in one pass
+APP_ID_LIST_PATTERN = re.compile(APP_URL_PATTERN.pattern + r'|(?:^|(?<=[\s,]))(\d+)(?=$|[\s,])')
+
+# /download share hosts: name -> (link prefix, flag); each is matched with the file id as a named group
+DOWNLOAD_HOSTS = {
+    'gofile': (r"https://gofile\.io/d/", "🇬"),
+    'pixeldrain': (r"https://pixeldrain\.com/u/", "🇵"),
+}
+DOWNLOAD_URL_PATTERN = re.compile("|".join(f"{prefix}(?P<{name}>[a-zA-Z0-9]+)" for name, (prefix, _) in DOWNLOAD_HOSTS.items()))
+
+CONTENT_DISPOSITION_FILENAME = re.compile(r"filename\*=(?:[\w-]+'[\w-]*')?([^;]+)|filename=\"?([^\";]+)\"?", re.IGNORECASE)
+
+EN_TO_TH_MONTHS = {
+    "Jan": "มกราคม", "Feb": "กุมภาพันธ์", "Mar": "มีนาคม", "Apr": "เมษายน",
+    "May": "พฤษภาคม", "Jun": "มิถุนายน", "Jul": "กรกฎาคม", "Aug": "สิงหาคม",
+    "Sep": "กันยายน", "Oct": "ตุลาคม", "Nov": "พฤศจิกายน", "Dec": "ธันวาคม"
+}
+TH_SHORT_TO_FULL_MONTHS = {
+    "ม.ค.": "มกราคม", "ก.พ.": "กุมภาพันธ์", "มี.ค.": "มีนาคม", "เม.ย.": "เมษายน",
+    "พ.ค.": "พฤษภาคม", "มิ.ย.": "มิถุนายน", "ก.ค.": "กรกฎาคม", "ส.ค.": "สิงหาคม",
+    "ก.ย.": "กันยายน", "ต.ค.": "ตุลาคม", "พ.ย.": "พฤศจิกายน", "ธ.ค.": "ธันวาคม"
+}
+MONTH_NUMBERS = {abbr: number for number, abbr in enumerate(EN_TO_TH_MONTHS, start=1)}
+THAI_MONTHS = list(EN_TO_TH_MONTHS.values())
+# The two layouts strptime used to try: "%b %d, %Y" and "%Y-%m-%d"
+STORE_DATE = re.compile(r"([A-Za-z]{3})\s+(\d{1,2}),\s+(\d{4})")
+ISO_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+JSON_DECODER = json.JSONDecoder()
+
+
+@functools.lru_cache(maxsize=4096)
+def extract_app_id(message_content: str) -> str | None:
+    if message_content.isdigit():
+        return message_content
+    match = APP_URL_PATTERN.search(message_content)
+    if match:
+        return match.group(1)
+    return None
+
+
+def extract_app_ids(text: str) -> list[str]:
+    app_ids = (url_id or bare_id for url_id, bare_id in APP_ID_LIST_PATTERN.findall(text))
+    return list(dict.fromkeys(app_ids))
+
+
+def convert_download_url(url: str, bypass_urls: dict[str, str]) -> tuple[str | None, str | None, str | None, str | None]:
+    """แปลง URL จาก gofile หรือ pixeldrain เป็น URL ใหม่ พร้อมคืน file_id และ flag"""
+    match = DOWNLOAD_URL_PATTERN.match(url)
+    if not match or match.lastgroup not in bypass_urls:
+        return None, None, None, None
+    host = match.lastgroup
+    file_id = match.group(host)
+    return f"{bypass_urls[host]}{file_id}", url, file_id, DOWNLOAD_HOSTS[host][1]
+
+
+def content_disposition_filename(value: str | None) -> str | None:
+    if not value:
+        return None
+    match = CONTENT_DISPOSITION_FILENAME.search(value)
+    if not match:
+        return None
+    encoded, plain = match.groups()
+    return unquote(encoded.strip()) if encoded else plain.strip()
+
+
+def thai_date(year: int, month: int, day: int) -> str | None:
+    try:
+        datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return f"{day} {THAI_MONTHS[month - 1]} {year}"
+
+
+@functools.lru_cache(maxsize=4096)
+def format_release_date(raw_date: str) -> str:
+    """Thai rendering of a Steam release date; Steam repeats the same few thousand strings, so results are memoized."""
+    if raw_date == 'ไม่ระบุ' or raw_date.lower() == 'tba':
+        return 'ไม่ระบุ'
+
+    for short, full in TH_SHORT_TO_FULL_MONTHS.items():
+        if short in raw_date:
+            return raw_date.replace(short, full)
+
+    formatted = None
+    match = STORE_DATE.fullmatch(raw_date)
+    if match and match.group(1).title() in MONTH_NUMBERS:
+        month, day, year = match.groups()
+        formatted = thai_date(int(year), MONTH_NUMBERS[month.title()], int(day))
+    else:
+        match = ISO_DATE.fullmatch(raw_date)
+        if match:
+            formatted = thai_date(*map(int, match.groups()))
+    if formatted:
+        return formatted
+
+    for eng_month, th_month in EN_TO_TH_MONTHS.items():
+        if eng_month in raw_date:
+            return raw_date.replace(eng_month, th_month)
+    return raw_date
+
+
+def loads_in_pieces(body: bytes | str, depth: int = 3):
+    """json.loads for multi-MB upstream bodies, decoded one container member at a time.
+
+    json.loads is a single C call that holds the GIL for the whole document,
+    so even on a worker thread it stalls the event loop for as long as the
+    parse takes. Here the outer ``depth`` levels of objects and arrays are
+    walked in Python and only their members are decoded natively, so a worker
+    thread running this lets the loop in between members.
+    """
+    text = body.decode() if isinstance(body, (bytes, bytearray)) else body
+    value, end = _decode_json(text, JSON_WHITESPACE.match(text).end(), depth)
+    if JSON_WHITESPACE.match(text, end).end() != len(text):
+        raise json.JSONDecodeError("Extra data", text, end)
+    return value
+
+
+def _decode_json(text: str, index: int, depth: int):
+    opening = text[index:index + 1]
+    if depth <= 0 or opening not in ("{", "["):
+        return JSON_DECODER.raw_decode(text, index)
+    closing = "}" if opening == "{" else "]"
+    container = {} if opening == "{" else []
+    index = JSON_WHITESPACE.match(text, index + 1).end()
+    if text[index:index + 1] == closing:
+        return container, index + 1
+    while True:
+        if opening == "{":
+            if text[index:index + 1] != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, index)
+            key, index = JSON_DECODER.raw_decode(text, index)
+            index = JSON_WHITESPACE.match(text, index).end()
+            if text[index:index + 1] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, index)
+            value, index = _decode_json(text, JSON_WHITESPACE.match(text, index + 1).end(), depth - 1)
+            container[key] = value
+        else:
+            value, index = _decode_json(text, index, depth - 1)
+            container.append(value)
+        index = JSON_WHITESPACE.match(text, index).end()
+        delimiter = text[index:index + 1]
+        if delimiter == closing:
+            return container, index + 1
+        if delimiter != ",":
+            raise json.JSONDecodeError(f"Expecting ',' or '{closing}' delimiter", text, index)
+        index = JSON_WHITESPACE.match(text, index + 1).end()
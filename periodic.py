@@ -0,0 +1,39 @@
+import asyncio
+
+
+class PeriodicTask:
+    """Runs an async callable immediately and then every ``interval`` seconds.
+
+    Failures are logged and the loop carries on; start() is safe to call on
+    every on_ready since only one loop is kept running.
+    """
+
+    def __init__(self, func, interval: float, name: str):
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self.runs = 0
+        self.failures = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.func()
+                self.runs += 1
+            except Exception as e:
+                self.failures += 1
+                print(f"{self.name} refresh error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {'runs': self.runs, 'failures': self.failures}
@@ -0,0 +1,161 @@
+import asyncio
+import functools
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import nextcord
+
+from cache import MISSING
+from tracing import span
+
+# Placeholder for a lookup that has not finished when a partial embed is sent
+PENDING = object()
+
+
+class CommandRejected(Exception):
+    """Raised by a parse stage; the message goes back to the user as an ephemeral reply."""
+
+
+@dataclass(frozen=True)
+class Lookup:
+    """One piece of data a command renders.
+
+    ``fetch(key)`` gets it, going upstream if need be. ``peek(key)``, when
+    given, answers from cache only: (value, None) if fresh, (stale value,
+    refresh task) if expired, (MISSING, None) if never seen.
+    """
+    fetch: Callable[..., Awaitable]
+    peek: Callable[..., tuple] | None = None
+
+
+def as_message(rendered) -> dict:
+    # render() returns an embed, or a dict of send() arguments when it attaches a file or a view
+    return rendered if isinstance(rendered, dict) else {'embed': rendered}
+
+
+class CommandPipeline:
+    """The authorize -> parse -> fetch -> render -> send path every slash command runs through.
+
+    ``authorize(interaction)`` answers the user itself and returns False to
+    stop the command (channel and rate-limit checks). ``parse()`` turns the
+    command options into a key or raises CommandRejected. The lookups are
+    fetched concurrently; if any is still running after ``partial_delay``,
+    render(key, ...) with PENDING placeholders is sent first and edited once
+    everything is in. With ``stale_while_revalidate``, commands whose
+    lookups can all peek() answer from cache straight away and the message
+    is edited if a background refresh comes back different. Every run is
+    timed as one ``tracer`` command, and parsed app IDs go to ``record``
+    (the prefetcher's history).
+    """
+
+    def __init__(self, authorize, tracer, record=None, partial_delay: float = 2.5,
+                 stale_while_revalidate: bool = True):
+        self.authorize = authorize
+        self.tracer = tracer
+        self.record = record
+        self.partial_delay = partial_delay
+        self.stale_while_revalidate = stale_while_revalidate
+        self.answered = 0
+        self.edited = 0
+        self.partials = 0
+        # Message edits waiting on background refreshes, referenced until they finish
+        self._revalidations: set[asyncio.Task] = set()
+
+    async def run(self, interaction: nextcord.Interaction, name: str, render, lookups=(), parse=None,
+                  record: bool = False):
+        with self.tracer.command(name):
+            if not await self.authorize(interaction):
+                return
+            try:
+                key = parse() if parse is not None else None
+            except CommandRejected as e:
+                await interaction.response.send_message(str(e), ephemeral=True)
+                return
+
+            with span("defer"):
+                await interaction.response.defer()
+            if record and self.record is not None:
+                for app_id in key if isinstance(key, list) else [key]:
+                    self.record(app_id)
+
+            render = functools.partial(render, key)
+            if self.stale_while_revalidate and lookups and all(lookup.peek for lookup in lookups):
+                if await self.answer_from_cache(interaction, render, [lookup.peek(key) for lookup in lookups]):
+                    return
+            values, partial_sent = await self.gather_with_partial(interaction, render, [lookup.fetch(key) for lookup in lookups])
+
+            with span("embed"):
+                message = as_message(render(*values))
+            with span("followup"):
+                if partial_sent:
+                    await interaction.edit_original_message(**message)
+                else:
+                    await interaction.followup.send(**message)
+
+    async def gather_with_partial(self, interaction: nextcord.Interaction, render, lookups: list) -> tuple[list, bool]:
+        """Run lookups concurrently. If any is still running after partial_delay,
+        send render(...) with PENDING placeholders and let the caller edit it later."""
+        if not lookups:
+            return [], False
+        tasks = [asyncio.ensure_future(lookup) for lookup in lookups]
+        done, pending = await asyncio.wait(tasks, timeout=self.partial_delay)
+        if not pending:
+            return [task.result() for task in tasks], False
+
+        partial = [task.result() if task in done else PENDING for task in tasks]
+        with span("partial_followup"):
+            await interaction.followup.send(**as_message(render(*partial)))
+        self.partials += 1
+        await asyncio.wait(pending)
+        return [task.result() for task in tasks], True
+
+    async def answer_from_cache(self, interaction: nextcord.Interaction, render, peeks: list) -> bool:
+        """Stale-while-revalidate: when every peek has a cached value, send render(...) of those right away.
+
+        If any of them was stale, the message is edited in place once the
+        background refreshes come back with something different. Returns False,
+        sending nothing, when a value has never been seen.
+        """
+        shown = [value for value, _ in peeks]
+        if any(value is MISSING for value in shown):
+            return False
+
+        with span("embed"):
+            message = as_message(render(*shown))
+        with span("followup"):
+            await interaction.followup.send(**message)
+        self.answered += 1
+
+        refreshes = [refresh for _, refresh in peeks]
+        if any(refreshes):
+            task = asyncio.ensure_future(self.update_if_changed(interaction, render, shown, refreshes))
+            self._revalidations.add(task)
+            task.add_done_callback(self._revalidations.discard)
+        return True
+
+    async def update_if_changed(self, interaction: nextcord.Interaction, render, shown: list, refreshes: list):
+        try:
+            fresh = [await refresh if refresh else value for value, refresh in zip(shown, refreshes)]
+        except Exception as e:
+            print(f"Revalidation error: {e}")
+            return
+        if fresh == shown:
+            return
+        try:
+            await interaction.edit_original_message(**as_message(render(*fresh)))
+            self.edited += 1
+        except nextcord.HTTPException as e:
+            print(f"Revalidated message edit failed: {e}")
+
+    async def drain(self):
+        """Wait for pending message edits (shutdown, benchmarks)."""
+        if self._revalidations:
+            await asyncio.gather(*self._revalidations, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            'answered_from_cache': self.answered,
+            'edited': self.edited,
+            'partials': self.partials,
+            'pending_edits': len(self._revalidations),
+        }
@@ -0,0 +1,114 @@
+import asyncio
+from collections import Counter, deque
+
+
+class Prefetcher:
+    """Background task that keeps the most requested app IDs warm in the bot's caches.
+
+    The hot set is the configured seed list plus the most frequent app IDs in
+    recent command history. Each pass spreads its refreshes evenly over
+    ``interval`` seconds (never closer than ``min_spacing``) so warming never
+    bursts against Steam or pythonanywhere.
+
+    With ``store`` (a ``shared_cache.SharedCache``) the hot set is saved after
+    every pass and read back on start, so a restarted bot re-warms what was
+    popular before instead of waiting for fresh command history. The store is
+    read on ``pool`` (a ``workers.WorkerPool``) when given.
+
+    Only one process runs the loop. The others publish() their command
+    history to the store under their ``name``, and every pass merges what
+    they published into the hot set.
+    """
+
+    def __init__(self, warm, seed_ids=(), history_size: int = 1000, hot_size: int = 50,
+                 interval: float = 240.0, min_spacing: float = 2.0, store=None, store_ttl: float = 7 * 24 * 3600,
+                 pool=None, name: str = "primary"):
+        self.warm = warm
+        self.seed_ids = [app_id for app_id in seed_ids if app_id]
+        self.history = deque(maxlen=history_size)
+        self.hot_size = hot_size
+        self.interval = interval
+        self.min_spacing = min_spacing
+        self.store = store
+        self.store_ttl = store_ttl
+        self.pool = pool
+        self.name = name
+        self.shared_history: list[str] = []
+        self.passes = 0
+        self.warmed = 0
+        self.failures = 0
+        self._task: asyncio.Task | None = None
+
+    def record(self, app_id: str):
+        self.history.append(app_id)
+
+    def hot_set(self) -> list[str]:
+        hot = list(dict.fromkeys(self.seed_ids))
+        for app_id, _ in (Counter(self.history) + Counter(self.shared_history)).most_common():
+            if len(hot) >= self.hot_size:
+                break
+            if app_id not in hot:
+                hot.append(app_id)
+        return hot[:self.hot_size]
+
+    def start(self):
+        # on_ready fires again after every reconnect; keep a single loop running
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _read(self, func, *args):
+        return await self.pool.run(func, *args) if self.pool is not None else func(*args)
+
+    async def restore(self):
+        row = await self._read(self.store.get, "prefetch", "hot")
+        if row is not None:
+            self.history.extend(row[0])
+
+    async def publish(self):
+        """Share this process's command history with the process running the prefetch loop."""
+        self.store.set("prefetch_history", self.name, list(self.history), self.store_ttl)
+
+    async def collect(self):
+        histories = await self._read(self.store.values, "prefetch_history")
+        self.shared_history = [app_id for history in histories for app_id in history]
+
+    def save(self, hot: list[str]):
+        if self.store is not None:
+            self.store.set("prefetch", "hot", hot, self.store_ttl)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        if self.store is not None and not self.history:
+            await self.restore()
+        while True:
+            if self.store is not None:
+                await self.collect()
+            hot = self.hot_set()
+            if not hot:
+                await asyncio.sleep(self.interval)
+                continue
+
+            spacing = max(self.min_spacing, self.interval / len(hot))
+            for app_id in hot:
+                try:
+                    await self.warm(app_id)
+                    self.warmed += 1
+                except Exception as e:
+                    self.failures += 1
+                    print(f"Prefetch error for {app_id}: {e}")
+                await asyncio.sleep(spacing)
+            self.passes += 1
+            self.save(hot)
+
+    def stats(self) -> dict:
+        return {
+            'hot_set': len(self.hot_set()),
+            'history': len(self.history),
+            'passes': self.passes,
+            'warmed': self.warmed,
+            'failures': self.failures,
+        }
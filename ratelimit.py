@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return seconds until one will be."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def reserve(self) -> float:
+        """Always take a token, going into debt if needed, and return how long to wait for it.
+
+        Reservations are handed out in call order, so callers that sleep for
+        the returned delay are served first come, first served.
+        """
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        """Give back a reserved token that was never used."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def available(self) -> bool:
+        self._refill()
+        return self.tokens >= 1
+
+
+class KeyedRateLimiter:
+    """One token bucket per key (user, channel, ...), dropping the least recently used keys."""
+
+    def __init__(self, rate: float, capacity: float, maxsize: int = 10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.maxsize = maxsize
+        self.limited = 0
+        self._buckets: OrderedDict = OrderedDict()
+
+    def try_acquire(self, key) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        retry_after = bucket.try_acquire()
+        if retry_after:
+            self.limited += 1
+        return retry_after
+
+    def refund(self, key):
+        """Hand back a token taken by try_acquire() for an action that did not go ahead."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.refund()
+
+    def stats(self) -> dict:
+        return {'keys': len(self._buckets), 'limited': self.limited}
+
+
+class UpstreamLimiter:
+    """Per-host token buckets that queue outgoing requests instead of dropping them.
+
+    ``acquire(host)`` returns once the host's bucket has a token for the
+    caller; callers wait in arrival order. ``queued`` and the wait statistics
+    show how much backpressure the upstream limits are applying.
+    """
+
+    def __init__(self, rate: float, capacity: float, overrides: dict[str, tuple[float, float]] | None = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.overrides = overrides or {}
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._buckets: dict[str, TokenBucket] = {}
+        self._queued: dict[str, int] = {}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, capacity = self.overrides.get(host, (self.rate, self.capacity))
+            bucket = self._buckets[host] = TokenBucket(rate, capacity)
+        return bucket
+
+    @property
+    def queued(self) -> int:
+        return sum(self._queued.values())
+
+    def available(self, host: str) -> bool:
+        """True when a request to ``host`` would get its token without queueing."""
+        return self._bucket(host).available()
+
+    async def acquire(self, host: str):
+        bucket = self._bucket(host)
+        delay = bucket.reserve()
+        if delay <= 0:
+            return
+        self._queued[host] = self._queued.get(host, 0) + 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Cancelled while queued (a losing hedge, a timed-out command): the token was never used
+            bucket.refund()
+            raise
+        finally:
+            self._queued[host] -= 1
+        self.waits += 1
+        self.wait_total += delay
+        self.wait_max = max(self.wait_max, delay)
+
+    def stats(self) -> dict:
+        return {
+            'queued': self.queued,
+            'queued_by_host': {host: count for host, count in self._queued.items() if count},
+            'waits': self.waits,
+            'avg_wait': self.wait_total / self.waits if self.waits else 0.0,
+            'max_wait': self.wait_max,
+        }
@@ -0,0 +1,292 @@
+import bisect
+import io
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+
+from http_client import HttpClient
+
+# Most archives have no comment, so a small tail already holds the EOCD record
+# and often the whole central directory; the second size covers the longest
+# comment a ZIP may carry, matching the window zipfile itself reads
+INITIAL_TAIL_SIZE = 8 * 1024
+TAIL_SIZE = 22 + 0xFFFF + 1
+EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+LOCAL_HEADER_SIZE = 30
+# The local header's extra field may differ from the central directory copy
+LOCAL_EXTRA_SLACK = 1024
+# Upper bound for a single extracted member; .lua files are a few KB
+MAX_MEMBER_SIZE = 16 * 1024 * 1024
+
+
+class RemoteZipError(Exception):
+    pass
+
+
+class SparseFile(io.RawIOBase):
+    """Seekable, read-only view of a remote file of which only some ranges were fetched.
+
+    ``zipfile.ZipFile`` only seeks to the end of the file and reads the
+    end-of-central-directory record and the central directory when it is
+    opened, so handing it a SparseFile holding just those ranges is enough to
+    list members without downloading the archive.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._starts: list[int] = []
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def add(self, start: int, data: bytes):
+        index = bisect.bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._chunks.insert(index, data)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        if self._pos < 0:
+            raise OSError("negative seek position")
+        return self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._pos
+        size = min(size, self.size - self._pos)
+        if size <= 0:
+            return b""
+        # Adjacent fetched ranges (central directory + tail) are read as one
+        pieces = []
+        while size > 0:
+            index = bisect.bisect_right(self._starts, self._pos) - 1
+            chunk = self._chunks[index] if index >= 0 else b""
+            offset = self._pos - self._starts[index] if index >= 0 else 0
+            if offset >= len(chunk):
+                if pieces:
+                    break
+                raise RemoteZipError(f"byte {self._pos} was not fetched")
+            data = chunk[offset:offset + size]
+            pieces.append(data)
+            self._pos += len(data)
+            size -= len(data)
+        return b"".join(pieces)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def has_comment(tail: bytes) -> bool:
+    # zipfile only skips the full TAIL_SIZE read when the EOCD fills the last 22 bytes exactly
+    return not (tail[-22:-18] == EOCD_SIGNATURE and tail[-2:] == b"\x00\x00")
+
+
+def locate_central_directory(tail: bytes, tail_start: int) -> tuple[int, int]:
+    """Return (absolute offset, size) of the central directory from the fetched tail of a ZIP.
+
+    The offset is taken as "right before the end records" rather than the
+    offset stored in the EOCD, so archives with data prepended still work.
+    """
+    eocd = tail.rfind(EOCD_SIGNATURE)
+    if eocd < 0 or len(tail) - eocd < 22:
+        raise zipfile.BadZipFile("end of central directory record not found")
+    cd_size, cd_offset = struct.unpack("<II", tail[eocd + 12:eocd + 20])
+    cd_end = tail_start + eocd
+
+    if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+        locator = eocd - 20
+        if locator < 0 or tail[locator:locator + 4] != ZIP64_LOCATOR_SIGNATURE:
+            raise zipfile.BadZipFile("ZIP64 locator not found")
+        # The record sits right before the locator; its stored offset ignores prepended data
+        record = locator - 56
+        if record < 0 or tail[record:record + 4] != ZIP64_EOCD_SIGNATURE:
+            raise zipfile.BadZipFile("ZIP64 end of central directory record not in fetched tail")
+        (cd_size,) = struct.unpack("<Q", tail[record + 40:record + 48])
+        cd_end = tail_start + record
+
+    return cd_end - cd_size, cd_size
+
+
+async def open_zip(file, pool=None) -> zipfile.ZipFile:
+    # Parsing a large central directory is CPU-bound; run it on the pool when there is one
+    if pool is not None:
+        return await pool.run(zipfile.ZipFile, file)
+    return zipfile.ZipFile(file)
+
+
+async def open_remote_zip(client: HttpClient, url: str, size: int | None = None,
+                          timeout: float = 15, pool=None, ranges: bool = True) -> zipfile.ZipFile:
+    """Open a remote ZIP by fetching only its tail and central directory.
+
+    Falls back to the full body when the server ignores the Range header;
+    ``ranges=False`` (a probe without Accept-Ranges) skips straight to it.
+    With a ``workers.WorkerPool`` the archive is parsed on the pool.
+    """
+    if not ranges:
+        response = await client.get(url, timeout=timeout)
+        response.raise_for_status()
+        return await open_zip(io.BytesIO(response.body), pool)
+    for tail_length in (INITIAL_TAIL_SIZE, TAIL_SIZE):
+        if size is not None:
+            tail_length = min(tail_length, size)
+        response = await client.get_range(url, -tail_length, timeout=timeout)
+        response.raise_for_status()
+        if response.status == 200:
+            return await open_zip(io.BytesIO(response.body), pool)
+
+        total = response.total_size
+        if total is None:
+            raise RemoteZipError(f"no Content-Range total in response from {url}")
+        tail = response.body
+        tail_start = total - len(tail)
+        try:
+            cd_offset, cd_size = locate_central_directory(tail, tail_start)
+        except zipfile.BadZipFile:
+            if tail_start == 0 or tail_length >= TAIL_SIZE:
+                raise
+            continue
+        if tail_start == 0 or len(tail) >= TAIL_SIZE or not has_comment(tail):
+            break
+
+    sparse = SparseFile(total)
+    sparse.add(tail_start, tail)
+    if cd_offset < 0:
+        raise zipfile.BadZipFile("central directory extends before start of file")
+    if cd_offset < tail_start:
+        response = await client.get_range(url, cd_offset, tail_start - 1, timeout=timeout)
+        response.raise_for_status()
+        if response.status == 200:
+            return await open_zip(io.BytesIO(response.body), pool)
+        sparse.add(cd_offset, response.body)
+
+    return await open_zip(sparse, pool)
+
+
+@dataclass
+class MemberLocation:
+    """Where a member lives inside an archive; enough to fetch it without the central directory."""
+    name: str
+    header_offset: int
+    compress_size: int
+    file_size: int
+    compress_type: int
+    crc: int
+    flag_bits: int
+    extra_length: int
+
+    @classmethod
+    def from_zipinfo(cls, info: zipfile.ZipInfo) -> "MemberLocation":
+        return cls(info.filename, info.header_offset, info.compress_size, info.file_size,
+                   info.compress_type, info.CRC, info.flag_bits, len(info.extra))
+
+
+def is_partial(zip_ref: zipfile.ZipFile) -> bool:
+    """True when zip_ref only holds the central directory rather than the whole archive."""
+    return isinstance(zip_ref.fp, SparseFile)
+
+
+def inflate_chunk(decompressor, data: bytes, crc: int) -> tuple[bytes, int]:
+    data = decompressor.decompress(data) if decompressor else data
+    return data, zlib.crc32(data, crc)
+
+
+def member_decompressor(member: MemberLocation):
+    if member.flag_bits & 0x1:
+        raise RemoteZipError(f"{member.name} is encrypted")
+    if member.compress_type == zipfile.ZIP_STORED:
+        return None
+    if member.compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.decompressobj(-zlib.MAX_WBITS)
+    raise RemoteZipError(f"unsupported compression method {member.compress_type} for {member.name}")
+
+
+async def read_member(client: HttpClient, url: str, member: MemberLocation, archive_size: int | None = None,
+                      timeout: float = 15, max_size: int = MAX_MEMBER_SIZE, pool=None) -> io.BytesIO:
+    """Extract one member into memory, range-fetching only its local header and data.
+
+    The compressed bytes are inflated chunk by chunk as they arrive, so memory
+    stays at one network chunk plus the extracted member however large the
+    archive is. With a ``workers.WorkerPool`` each chunk is inflated on the
+    pool instead of the event loop thread.
+    """
+    if member.file_size > max_size:
+        raise RemoteZipError(f"{member.name} is {member.file_size} bytes, limit is {max_size}")
+
+    start = member.header_offset
+    end = (start + LOCAL_HEADER_SIZE + len(member.name.encode()) + member.extra_length
+           + member.compress_size + LOCAL_EXTRA_SLACK)
+    if archive_size is not None:
+        end = min(end, archive_size)
+    end -= 1
+    decompressor = member_decompressor(member)
+    output = io.BytesIO()
+    crc = 0
+    header = b""
+    remaining = member.compress_size
+
+    async with client.stream(url, timeout=timeout, headers={"Range": f"bytes={start}-{end}"}) as response:
+        if response.status >= 400:
+            raise RemoteZipError(f"HTTP {response.status} for {url}")
+        # A server that ignores Range streams from byte 0; skip up to the member
+        skip = start if response.status == 200 else 0
+
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            if skip:
+                if len(chunk) <= skip:
+                    skip -= len(chunk)
+                    continue
+                chunk, skip = chunk[skip:], 0
+
+            if header is not None:
+                header += chunk
+                if len(header) < LOCAL_HEADER_SIZE:
+                    continue
+                if header[:4] != LOCAL_HEADER_SIGNATURE:
+                    raise zipfile.BadZipFile(f"bad local header for {member.name}")
+                name_length, extra_length = struct.unpack("<HH", header[26:30])
+                data_start = LOCAL_HEADER_SIZE + name_length + extra_length
+                if len(header) < data_start:
+                    continue
+                chunk, header = header[data_start:], None
+
+            data = chunk[:remaining]
+            remaining -= len(data)
+            if pool is not None:
+                data, crc = await pool.run(inflate_chunk, decompressor, data, crc)
+            else:
+                data, crc = inflate_chunk(decompressor, data, crc)
+            if output.tell() + len(data) > max_size:
+                raise RemoteZipError(f"{member.name} inflates past {max_size} bytes")
+            output.write(data)
+            if remaining <= 0:
+                break
+
+    if remaining > 0:
+        raise zipfile.BadZipFile(f"{member.name} was truncated")
+    if decompressor:
+        data = decompressor.flush()
+        crc = zlib.crc32(data, crc)
+        output.write(data)
+    if crc != member.crc:
+        raise zipfile.BadZipFile(f"CRC mismatch for {member.name}")
+    output.seek(0)
+    return output
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after ``failure_threshold`` consecutive failures.
+
+    While open every call is refused immediately. After ``reset_timeout``
+    seconds one trial call is let through (half-open): success closes the
+    circuit again, failure re-opens it for another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.trial_at = now
+            return True
+        # One trial at a time; a trial that never reported back (cancelled) is replaced after reset_timeout
+        if now - self.trial_at < self.reset_timeout:
+            self.rejected += 1
+            return False
+        self.trial_at = now
+        return True
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            'state': self.state,
+            'open': self.state != CLOSED,
+            'failures': self.failures,
+            'trips': self.trips,
+            'rejected': self.rejected,
+        }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per upstream host, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def before(self, host: str):
+        if not self.get(host).allow():
+            raise CircuitOpenError(f"circuit open for {host}")
+
+    def record(self, host: str, ok: bool):
+        breaker = self.get(host)
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def is_open(self, host: str) -> bool:
+        breaker = self._breakers.get(host)
+        return breaker is not None and breaker.state != CLOSED
+
+    def stats(self) -> dict:
+        return {host: breaker.stats() for host, breaker in self._breakers.items()}
+
+
+async def hedged(factory, delay: float, hedge=None, allow=None):
+    """Await factory(); if it has not finished after ``delay`` seconds, race a second copy.
+
+    The second copy is ``hedge()`` when given, otherwise another factory().
+    ``allow()``, when given, is asked at hedge time and returning False
+    skips the hedge and keeps waiting on the first call. The first
+    successful result wins and the other call is cancelled. If both fail,
+    the later error is raised. A delay of 0 or less disables the hedge.
+    """
+    if delay <= 0:
+        return await factory()
+
+    tasks = [asyncio.ensure_future(factory())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or (allow is not None and not allow()):
+            return await tasks[0]
+
+        tasks.append(asyncio.ensure_future((hedge or factory)()))
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import time
+
+
+def parse_shard_ids(value: str) -> list[int] | None:
+    ids = [int(part) for part in value.replace(" ", "").split(",") if part]
+    return ids or None
+
+
+def split_shards(shard_count: int, processes: int) -> list[list[int]]:
+    """Spread shard IDs over processes round-robin: 5 shards on 2 processes -> [0, 2, 4], [1, 3]."""
+    return [list(range(index, shard_count, processes)) for index in range(min(processes, shard_count))]
+
+
+def launch_shard_processes(script: str, shard_count: int, processes: int, shared_cache_path: str) -> int:
+    """Run one copy of script per slice of shards and supervise them.
+
+    Each child gets SHARD_COUNT / SHARD_IDS for its slice, its own PORT
+    (base port + index) and the same SHARED_CACHE_PATH. When any child exits
+    the others are stopped too and its exit code is returned, so the
+    container restarts as a whole.
+    """
+    base_port = int(os.environ.get("PORT", 8080))
+    children = []
+    for index, shard_ids in enumerate(split_shards(shard_count, processes)):
+        env = {
+            **os.environ,
+            "SHARD_COUNT": str(shard_count),
+            "SHARD_IDS": ",".join(map(str, shard_ids)),
+            "SHARD_PROCESSES": "1",
+            "SHARED_CACHE_PATH": shared_cache_path,
+            "PORT": str(base_port + index),
+        }
+        children.append(subprocess.Popen([sys.executable, script], env=env))
+        print(f"Started shard process {index} (pid {children[-1].pid}) for shards {shard_ids}")
+
+    try:
+        while True:
+            for child in children:
+                code = child.poll()
+                if code is not None:
+                    print(f"Shard process {child.pid} exited with {code}; stopping the others")
+                    return code
+            time.sleep(1)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.terminate()
+        for child in children:
+            try:
+                child.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                child.kill()
@@ -0,0 +1,154 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    stored_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_stale ON entries (stale_until);
+"""
+
+
+class SharedCache:
+    """SQLite-backed key/value store shared by every bot process pointed at the same file.
+
+    Sits behind the in-process TTLCaches so shards running in separate
+    processes see each other's Steam and file-status lookups instead of each
+    fetching them again. Being a file, it also outlives the process: after a
+    restart entries are read back lazily on first use, so the bot starts
+    warm instead of refetching everything. WAL mode lets readers carry on while another process
+    writes. Values are stored as JSON and expiry uses wall-clock time, since
+    monotonic clocks are not comparable between processes. A locked or broken
+    database is treated as a miss; the caller just fetches upstream.
+
+    set() only queues the row: a writer thread commits whatever has queued up
+    in one transaction, so the event loop never waits on the file lock.
+    Reads may come from worker threads; the connection is shared behind a lock.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 1.0):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(entries)")}
+        if "stored_at" not in columns:
+            # Files written before entries were timestamped
+            self.db.execute("ALTER TABLE entries ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self._pending: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="shared-cache-writer", daemon=True)
+        self._writer.start()
+
+    def get(self, namespace: str, key: str) -> tuple[object, float, float] | None:
+        """(value, expires_at, stale_until) for key, or None when absent or past its stale window."""
+        try:
+            with self.lock:
+                row = self.db.execute(
+                    "SELECT value, expires_at, stale_until FROM entries WHERE namespace = ? AND key = ? AND stale_until > ?",
+                    (namespace, key, time.time()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Shared cache read error: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value, expires_at, stale_until = row
+        return json.loads(value), expires_at, stale_until
+
+    def set(self, namespace: str, key: str, value, ttl: float, stale_ttl: float = 0.0):
+        now = time.time()
+        # Serialised here so later changes to a mutable value do not leak into the queued row
+        self._pending.put((namespace, key, json.dumps(value), now + ttl, now + ttl + stale_ttl, now))
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            if rows:
+                self._commit(rows)
+            for _ in batch:
+                self._pending.task_done()
+            if len(rows) < len(batch):
+                return
+
+    def _commit(self, rows: list[tuple]):
+        try:
+            with self.lock:
+                self.db.execute("BEGIN")
+                try:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, stale_until, stored_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self.db.execute("COMMIT")
+                except sqlite3.Error:
+                    self.db.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Shared cache write error: {e}")
+            return
+        self.writes += len(rows)
+
+    def flush(self):
+        """Block until every queued set() has been written."""
+        self._pending.join()
+
+    def values(self, namespace: str) -> list:
+        """Every value in namespace still inside its stale window."""
+        try:
+            with self.lock:
+                rows = self.db.execute(
+                    "SELECT value FROM entries WHERE namespace = ? AND stale_until > ?", (namespace, time.time()),
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Shared cache read error: {e}")
+            return []
+        return [json.loads(value) for value, in rows]
+
+    def purge(self) -> int:
+        """Drop entries past their stale window; returns how many were removed."""
+        try:
+            with self.lock:
+                return self.db.execute("DELETE FROM entries WHERE stale_until <= ?", (time.time(),)).rowcount
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Shared cache purge error: {e}")
+            return 0
+
+    def close(self):
+        # Queued rows are written before the connection goes away
+        self._pending.put(None)
+        self._writer.join()
+        with self.lock:
+            self.db.close()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes, 'errors': self.errors}
@@ -0,0 +1,20 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench import BENCH_DEFAULTS  # noqa: E402
+
+# core.py reads its configuration at import time: no shared store, no rate
+# limits (the Steam store has its own), and no partial embeds, so a command
+# sends exactly one message
+TEST_ENV = {
+    **BENCH_DEFAULTS,
+    "STEAM_STORE_RATE": "1000000",
+    "STEAM_STORE_BURST": "1000000",
+    "PARTIAL_EMBED_DELAY": "30",
+    "STEAM_HEDGE_DELAY": "0",
+}
+for name, value in TEST_ENV.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,38 @@
+from app_index import AppNameIndex
+
+ENTRIES = [
+    (730, "Counter-Strike 2"),
+    (570, "Dota 2"),
+    (1091500, "Cyberpunk 2077"),
+    (2947440, "Silent Hill f"),
+    (1245620, "ELDEN RING"),
+]
+
+
+def test_search_prefers_prefix_matches():
+    index = AppNameIndex(ENTRIES)
+    assert index.search("cyber")[0] == (1091500, "Cyberpunk 2077")
+    assert index.search("elden ring", limit=1) == [(1245620, "ELDEN RING")]
+
+
+def test_search_matches_mid_word():
+    index = AppNameIndex(ENTRIES)
+    assert (1091500, "Cyberpunk 2077") in index.search("punk")
+
+
+def test_autocomplete_still_suggests_partial_matches():
+    index = AppNameIndex(ENTRIES)
+    assert index.search("cyberpunkk")
+
+
+def test_resolve_exact_and_prefix():
+    index = AppNameIndex(ENTRIES)
+    assert index.resolve("Dota 2") == "570"
+    assert index.resolve("silent hill") == "2947440"
+
+
+def test_resolve_rejects_unrelated_text():
+    index = AppNameIndex(ENTRIES)
+    assert index.resolve("https://example.com/app/abc") is None
+    assert index.resolve("cyberpunkk") is None
+    assert index.resolve("") is None
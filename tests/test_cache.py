@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+import pytest
+
+from cache import MISSING, RequestCoalescer, TTLCache
+from shared_cache import SharedCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_and_negatives_expire_sooner(clock):
+    cache = TTLCache(ttl=60, negative_ttl=5)
+    cache.set("730", {'name': "Counter-Strike 2"})
+    cache.set("0", None, negative=True)
+    assert cache.get("0", MISSING) is None
+    clock[0] += 10
+    assert cache.get("0", MISSING) is MISSING
+    assert cache.get("730") == {'name': "Counter-Strike 2"}
+    clock[0] += 60
+    assert cache.get("730", MISSING) is MISSING
+
+
+def test_stale_entries_outlive_ttl(clock):
+    cache = TTLCache(ttl=60, stale_ttl=300)
+    cache.set("730", "cached")
+    clock[0] += 120
+    assert cache.get("730", MISSING) is MISSING
+    assert cache.get_stale("730") == "cached"
+    clock[0] += 300
+    assert cache.get_stale("730", MISSING) is MISSING
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.stats()['evictions'] == 1
+
+
+def test_shared_writes_are_batched_off_the_caller(tmp_path):
+    store = SharedCache(str(tmp_path / "shared.sqlite3"))
+    writer = TTLCache(ttl=60, shared=store, namespace="steam")
+    for n in range(50):
+        writer.set(str(n), {'n': n})
+    store.flush()
+    assert store.stats()['writes'] == 50
+    assert store.get("steam", "49")[0] == {'n': 49}
+    store.close()
+
+
+def test_load_reads_another_processes_entry_on_pool(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first, second = SharedCache(path), SharedCache(path)
+    TTLCache(ttl=60, shared=first, namespace="steam").set("730", {'name': "Counter-Strike 2"})
+    first.flush()
+
+    threads = []
+
+    class Pool:
+        async def run(self, func, *args):
+            def call():
+                threads.append(threading.current_thread())
+                return func(*args)
+            return await asyncio.to_thread(call)
+
+    reader = TTLCache(ttl=60, shared=second, namespace="steam")
+    # get() never touches the store itself
+    assert reader.get("730", MISSING) is MISSING
+    asyncio.run(reader.load("730", Pool()))
+    assert reader.get("730") == {'name': "Counter-Strike 2"}
+    assert threads and threads[0] is not threading.main_thread()
+    first.close()
+    second.close()
+
+
+def test_coalescer_shares_one_call():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        coalescer = RequestCoalescer()
+        return await asyncio.gather(*(coalescer.run("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_purge_drops_rows_past_their_stale_window(tmp_path):
+    store = SharedCache(str(tmp_path / "shared.sqlite3"))
+    store.set("steam", "old", 1, ttl=-10, stale_ttl=5)
+    store.set("steam", "stale", 2, ttl=-10, stale_ttl=60)
+    store.set("steam", "fresh", 3, ttl=60)
+    store.flush()
+    assert store.purge() == 1
+    assert store.get("steam", "stale")[0] == 2
+    store.close()
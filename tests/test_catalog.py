@@ -0,0 +1,61 @@
+import sqlite3
+
+from catalog import GameCatalog, parse_games_listing
+
+LISTING = {
+    'total': 2,
+    'total_dlc': 2,
+    'games': [
+        {'app_id': 730, 'name': "Counter-Strike 2"},
+        {'appid': "1091500", 'name': "Cyberpunk 2077", 'dlc': [{'app_id': 2138330, 'name': "Phantom Liberty"}, 2138331]},
+    ],
+}
+
+
+def test_parse_games_listing_flattens_nested_dlc():
+    assert parse_games_listing(LISTING) == [
+        (730, "Counter-Strike 2", 0, None),
+        (1091500, "Cyberpunk 2077", 0, None),
+        (2138330, "Phantom Liberty", 1, 1091500),
+        (2138331, None, 1, 1091500),
+    ]
+    assert parse_games_listing({'unexpected': True}) == []
+
+
+def test_sync_only_touches_changes():
+    catalog = GameCatalog(":memory:")
+    rows = parse_games_listing(LISTING)
+    assert catalog.sync(rows) == (4, 0, 0)
+    assert catalog.sync(rows) == (0, 0, 0)
+    renamed = [(730, "CS2", 0, None)] + rows[1:3]
+    assert catalog.sync(renamed) == (0, 1, 1)
+    assert catalog.contains("730") and not catalog.contains(2138331)
+    assert catalog.dlc_of(1091500) == [2138330]
+
+
+def test_matches_listing_totals():
+    catalog = GameCatalog(":memory:")
+    catalog.sync(parse_games_listing(LISTING))
+    assert catalog.matches({'total': 2, 'total_dlc': 2})
+    assert not catalog.matches({'total': 3, 'total_dlc': 2})
+    assert not catalog.matches({'total': 2})
+    assert not catalog.matches(None)
+
+
+def test_sync_on_worker_does_not_block_readers(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    catalog = GameCatalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.sync(parse_games_listing(LISTING))
+    writer = sqlite3.connect(catalog.path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("DELETE FROM apps")
+    # A write transaction is open in another connection; readers still see the last commit
+    assert catalog.contains(730) and catalog.dlc_of(1091500) == [2138330, 2138331]
+    writer.rollback()
+
+    rows = [(n, f"Game {n}", 0, None) for n in range(10000, 11000)]
+    with ThreadPoolExecutor(1) as pool:
+        assert pool.submit(catalog.sync, rows).result() == (1000, 0, 4)
+    assert len(catalog) == 1000 and catalog.totals == (1000, 0)
+    assert catalog.contains(10999) and not catalog.contains(730)
@@ -0,0 +1,15 @@
+import pytest
+
+import core
+from pipeline import CommandRejected
+
+
+def test_bulk_ids_over_the_limit_are_rejected_with_the_count():
+    ids = " ".join(str(10 + i) for i in range(core.BULK_MAX_IDS + 3))
+    with pytest.raises(CommandRejected, match="เกินมา 3 รายการ"):
+        core.parse_app_id_list(ids)
+
+
+def test_bulk_ids_at_the_limit_are_kept():
+    ids = ",".join(str(10 + i) for i in range(core.BULK_MAX_IDS))
+    assert len(core.parse_app_id_list(ids)) == core.BULK_MAX_IDS
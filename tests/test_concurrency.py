@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+import core
+from bench import BenchInteraction
+from http_client import HttpResponse, ProbeResult
+from ratelimit import KeyedRateLimiter
+
+UPSTREAM_DELAY = 0.3
+
+
+@pytest.fixture
+def slow_upstream(monkeypatch):
+    """Answers every Steam and file-server call after a fixed delay."""
+    calls = []
+
+    async def send(method, url, host, **kwargs):
+        calls.append(url)
+        await asyncio.sleep(UPSTREAM_DELAY)
+        app_id = url.split("appids=")[1].split("&")[0]
+        body = json.dumps({app_id: {"success": True, "data": {"name": f"Game {app_id}"}}}).encode()
+        return HttpResponse(200, url, CIMultiDictProxy(CIMultiDict()), body)
+
+    async def probe(url, **kwargs):
+        calls.append(url)
+        await asyncio.sleep(UPSTREAM_DELAY)
+        headers = CIMultiDictProxy(CIMultiDict({"Content-Disposition": 'attachment; filename="game.zip"'}))
+        return ProbeResult(200, url, headers, 1024, None, True)
+
+    monkeypatch.setattr(core.http, "_send", send)
+    monkeypatch.setattr(core.http, "probe", probe)
+    return calls
+
+
+def run_gens(app_ids: list[str]) -> tuple[float, list[BenchInteraction]]:
+    channel_id = next(iter(core.ALLOWED_CHANNEL_IDS))
+    interactions = [BenchInteraction(channel_id, user_id, 0) for user_id in range(len(app_ids))]
+
+    async def scenario():
+        started = time.perf_counter()
+        await asyncio.gather(*(core.gen.callback(interaction, app_id)
+                               for interaction, app_id in zip(interactions, app_ids)))
+        return time.perf_counter() - started
+
+    return core.bot.loop.run_until_complete(scenario()), interactions
+
+
+def test_gen_commands_run_concurrently(slow_upstream):
+    app_ids = [str(900000 + n) for n in range(20)]
+    elapsed, interactions = run_gens(app_ids)
+    # Steam info and the file probe of every command overlap: about one delay, not 20
+    assert elapsed < 2 * UPSTREAM_DELAY
+    assert all(interaction.messages == 1 and not interaction.rejected for interaction in interactions)
+    assert len(slow_upstream) == 2 * len(app_ids)
+
+
+def test_concurrent_gens_for_one_app_share_upstream_calls(slow_upstream):
+    elapsed, interactions = run_gens(["910000"] * 10)
+    assert elapsed < 2 * UPSTREAM_DELAY
+    assert all(interaction.messages == 1 for interaction in interactions)
+    assert len(slow_upstream) == 2
+
+
+def test_prefetch_shares_requests_with_commands(slow_upstream):
+    async def scenario():
+        warm = asyncio.ensure_future(core.warm_app("920000"))
+        await asyncio.sleep(0)
+        await core.gen.callback(BenchInteraction(next(iter(core.ALLOWED_CHANNEL_IDS)), 1, 0), "920000")
+        await warm
+
+    core.bot.loop.run_until_complete(scenario())
+    assert len([url for url in slow_upstream if "appdetails" in url]) == 1
+
+
+def test_channel_limit_does_not_spend_user_tokens(monkeypatch):
+    monkeypatch.setattr(core, "user_limiter", KeyedRateLimiter(rate=0.01, capacity=1))
+    monkeypatch.setattr(core, "channel_limiter", KeyedRateLimiter(rate=0.01, capacity=1))
+    channel_id = next(iter(core.ALLOWED_CHANNEL_IDS))
+
+    async def scenario():
+        assert await core.admit(BenchInteraction(channel_id, 1, 0))
+        # Channel bucket is now empty: user 2 is turned away but keeps their token
+        assert not await core.admit(BenchInteraction(channel_id, 2, 0))
+        return core.user_limiter.try_acquire(2)
+
+    assert core.bot.loop.run_until_complete(scenario()) == 0.0
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+import core
+from http_client import ProbeResult
+
+
+def probe_result(status: int, **headers) -> ProbeResult:
+    return ProbeResult(status, "https://gf.example/file", CIMultiDictProxy(CIMultiDict(headers)), 2048, None, True)
+
+
+@pytest.fixture
+def answer(monkeypatch):
+    """Makes every http.probe answer with the status set on the returned dict, after an optional delay."""
+    state = {'status': 200, 'delay': 0.0, 'calls': 0}
+
+    async def probe(url, **kwargs):
+        state['calls'] += 1
+        await asyncio.sleep(state['delay'])
+        return probe_result(state['status'], **{"Content-Disposition": 'attachment; filename="game.zip"'})
+
+    monkeypatch.setattr(core.http, "probe", probe)
+    core.link_status_cache.clear()
+    core.file_status_cache.clear()
+    return state
+
+
+def run(coro):
+    return core.bot.loop.run_until_complete(coro)
+
+
+def test_live_link_reports_name_and_size(answer):
+    status = run(core.fetch_link_status("https://gf.example/live"))
+    assert status == {'alive': True, 'name': "game.zip", 'size': 2048}
+    assert core.link_status_cache.get("https://gf.example/live") == status
+
+
+def test_missing_link_is_dead_and_cached(answer):
+    answer['status'] = 404
+    assert run(core.fetch_link_status("https://gf.example/gone"))['alive'] is False
+    assert core.link_status_cache.get("https://gf.example/gone")['alive'] is False
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_throttled_or_failing_host_is_unknown_and_not_cached(answer, status):
+    answer['status'] = status
+    assert run(core.fetch_link_status("https://gf.example/busy")) == {'alive': None, 'name': None, 'size': None}
+    assert core.link_status_cache.get("https://gf.example/busy") is None
+
+
+def test_throttled_file_server_is_not_cached_as_no_file(answer):
+    answer['status'] = 429
+    assert run(core.fetch_file_probe("930000")) is None
+    assert core.file_status_cache.get("930000", core.MISSING) is core.MISSING
+
+
+def test_one_host_paste_is_checked_in_one_round(answer):
+    answer['delay'] = 0.2
+    urls = [f"https://gf.example/{n}" for n in range(20)]
+
+    async def check_all():
+        return await asyncio.gather(*(core.get_link_status(url) for url in urls))
+
+    started = time.perf_counter()
+    statuses = run(check_all())
+    assert time.perf_counter() - started < 0.35
+    assert all(status['alive'] for status in statuses)
+
+
+def test_stale_no_file_is_checked_again_not_peeked(answer):
+    core.file_status_cache.set("4000", None, ttl=-1)
+
+    async def scenario():
+        peeked = core.peek_file_probe("4000")
+        return peeked, await core.probe_file("4000")
+
+    peeked, probe = run(scenario())
+    assert peeked == (core.MISSING, None)
+    assert probe.url == "https://gf.example/file"
+    assert answer['calls'] == 1
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from parsing import convert_download_url, extract_app_ids, loads_in_pieces
+
+
+@pytest.mark.parametrize("text", [
+    '[]',
+    '{}',
+    ' {"applist" : {"apps": [{"appid": 10, "name": "Counter-Strike"}, {"appid": 20, "name": "\\u00e9"}]}} ',
+    '{"total": 2, "total_dlc": 1, "games": [{"app_id": 1, "dlc": [3]}, {"app_id": 2, "dlc": []}]}',
+    '[1, 2.5, "x", null, true, [[[4]]]]',
+])
+def test_loads_in_pieces_matches_json_loads(text):
+    assert loads_in_pieces(text) == json.loads(text)
+    assert loads_in_pieces(text.encode()) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ['[1, 2', '{"a" 1}', '{1: 2}', '[1] x', '[1,]', ''])
+def test_loads_in_pieces_rejects_invalid_json(text):
+    with pytest.raises(ValueError):
+        loads_in_pieces(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("730", ["730"]),
+    ("730, 570 440", ["730", "570", "440"]),
+    ("https://store.steampowered.com/app/730/CounterStrike_2/ 570", ["730", "570"]),
+    ("730 730,730", ["730"]),
+    ("abc730 730x 12.5", []),
+    ("", []),
+])
+def test_extract_app_ids(text, expected):
+    assert extract_app_ids(text) == expected
+
+
+BYPASS = {'gofile': "https://bypass.example/g/", 'pixeldrain': "https://bypass.example/p/"}
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://gofile.io/d/AbC123", ("https://bypass.example/g/AbC123", "https://gofile.io/d/AbC123", "AbC123", "🇬")),
+    ("https://pixeldrain.com/u/xyz9", ("https://bypass.example/p/xyz9", "https://pixeldrain.com/u/xyz9", "xyz9", "🇵")),
+    ("https://example.com/d/AbC123", (None, None, None, None)),
+    ("gofile.io/d/AbC123", (None, None, None, None)),
+])
+def test_convert_download_url(url, expected):
+    assert convert_download_url(url, BYPASS) == expected
+
+
+def test_convert_download_url_skips_hosts_without_bypass():
+    assert convert_download_url("https://pixeldrain.com/u/xyz9", {'gofile': BYPASS['gofile']}) == (None, None, None, None)
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+import core
+from bench import BenchInteraction
+from http_client import HttpResponse, ProbeResult
+
+
+def run(coro):
+    return core.bot.loop.run_until_complete(coro)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Steam answers with whatever name is set on the returned dict; the file server always has the file."""
+    state = {'name': "Old Name", 'steam_calls': 0}
+
+    async def send(method, url, host, **kwargs):
+        state['steam_calls'] += 1
+        app_id = url.split("appids=")[1].split("&")[0]
+        body = json.dumps({app_id: {"success": True, "data": {"name": state['name']}}}).encode()
+        return HttpResponse(200, url, CIMultiDictProxy(CIMultiDict()), body)
+
+    async def probe(url, **kwargs):
+        headers = CIMultiDictProxy(CIMultiDict({"Content-Disposition": 'attachment; filename="game.zip"'}))
+        return ProbeResult(200, url, headers, 1024, None, True)
+
+    monkeypatch.setattr(core.http, "_send", send)
+    monkeypatch.setattr(core.http, "probe", probe)
+    return state
+
+
+class EditRecorder(BenchInteraction):
+    def __init__(self, user_id: int):
+        super().__init__(next(iter(core.ALLOWED_CHANNEL_IDS)), user_id, 0)
+        self.edits = []
+
+    async def edit_original_message(self, *args, **kwargs):
+        self.edits.append(kwargs)
+
+
+def gen_twice(upstream, app_id: str, new_name: str) -> EditRecorder:
+    """Runs /gen, lets both cached lookups expire into their stale window, then runs it again."""
+    run(core.gen.callback(EditRecorder(1), app_id))
+    for cache in (core.steam_cache, core.file_status_cache):
+        cache.set(app_id, cache.get(app_id), ttl=-1)
+    upstream['name'] = new_name
+    second = EditRecorder(2)
+
+    async def scenario():
+        await core.gen.callback(second, app_id)
+        await core.pipeline.drain()
+
+    run(scenario())
+    return second
+
+
+def test_stale_answer_is_edited_when_upstream_changed(upstream):
+    answered = core.pipeline.answered
+    second = gen_twice(upstream, "930000", "New Name")
+    assert core.pipeline.answered == answered + 1
+    assert second.messages == 1
+    assert len(second.edits) == 1
+    assert "New Name" in str(second.edits[0]['embed'].to_dict())
+    assert upstream['steam_calls'] == 2
+
+
+def test_stale_answer_is_left_alone_when_upstream_unchanged(upstream):
+    second = gen_twice(upstream, "930001", "Old Name")
+    assert second.messages == 1
+    assert second.edits == []
+    assert upstream['steam_calls'] == 2
+
+
+def test_failed_refresh_leaves_the_message_alone(capsys):
+    interaction = BenchInteraction(1, 1, 0)
+    edited = core.pipeline.edited
+
+    async def failing():
+        raise RuntimeError("upstream exploded")
+
+    async def scenario():
+        await core.pipeline.update_if_changed(interaction, lambda value: value, ["old"],
+                                              [asyncio.ensure_future(failing())])
+
+    run(scenario())
+    assert core.pipeline.edited == edited
+    assert "upstream exploded" in capsys.readouterr().out
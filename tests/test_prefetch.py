@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import core
+from prefetch import Prefetcher
+from shared_cache import SharedCache
+
+
+class ThreadPool:
+    def __init__(self):
+        self.threads = []
+
+    async def run(self, func, *args):
+        def call():
+            self.threads.append(threading.current_thread())
+            return func(*args)
+        return await asyncio.to_thread(call)
+
+
+def test_hot_set_puts_seeds_first_then_most_requested():
+    prefetcher = Prefetcher(None, seed_ids=["730", ""], hot_size=3)
+    for app_id in ["1", "2", "2", "3", "3", "3", "730"]:
+        prefetcher.record(app_id)
+    assert prefetcher.hot_set() == ["730", "3", "2"]
+
+
+def test_restores_saved_hot_set_on_pool_before_warming(tmp_path):
+    store = SharedCache(str(tmp_path / "shared.sqlite3"))
+    Prefetcher(None, store=store).save(["10", "20"])
+    store.flush()
+
+    warmed = []
+
+    async def warm(app_id):
+        warmed.append(app_id)
+
+    async def scenario():
+        pool = ThreadPool()
+        prefetcher = Prefetcher(warm, interval=0.01, min_spacing=0, store=store, pool=pool)
+        prefetcher.start()
+        while len(warmed) < 2:
+            await asyncio.sleep(0.01)
+        prefetcher.stop()
+        return pool.threads
+
+    threads = asyncio.run(scenario())
+    assert warmed[:2] == ["10", "20"]
+    assert threads and threads[0] is not threading.main_thread()
+    store.close()
+
+
+def test_warming_skips_the_file_server_for_ruled_out_apps(monkeypatch):
+    probed = []
+
+    async def probe(url, **kwargs):
+        probed.append(url)
+
+    async def steam_info(app_id):
+        return {}
+
+    monkeypatch.setattr(core.http, "probe", probe)
+    monkeypatch.setattr(core, "fetch_steam_info", steam_info)
+    monkeypatch.setattr(core, "file_gates", [lambda app_id: app_id == "5000"])
+    core.file_status_cache.clear()
+    core.bot.loop.run_until_complete(core.warm_app("5000"))
+    assert probed == []
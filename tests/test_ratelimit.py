@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from ratelimit import KeyedRateLimiter, TokenBucket, UpstreamLimiter
+
+
+def test_token_bucket_spends_burst_then_reports_wait():
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5, abs=0.01)
+
+
+def test_reserve_goes_into_debt_in_call_order():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    assert not bucket.available()
+
+
+def test_refund_never_exceeds_capacity():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.refund()
+    assert bucket.tokens == 1
+
+
+def test_keyed_limiter_isolates_keys():
+    limiter = KeyedRateLimiter(rate=0.1, capacity=1)
+    assert limiter.try_acquire("alice") == 0.0
+    assert limiter.try_acquire("alice") > 0
+    assert limiter.try_acquire("bob") == 0.0
+    assert limiter.stats() == {'keys': 2, 'limited': 1}
+
+
+def test_upstream_limiter_queues_and_refunds_cancelled_waiters():
+    async def scenario():
+        limiter = UpstreamLimiter(rate=10, capacity=1)
+        await limiter.acquire("steam")
+        waiter = asyncio.ensure_future(limiter.acquire("steam"))
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.queued == 0
+        # The cancelled reservation was handed back, so the next caller waits one slot, not two
+        started = asyncio.get_running_loop().time()
+        await limiter.acquire("steam")
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(scenario()) < 0.15
+
+
+def test_upstream_limiter_available_per_host():
+    limiter = UpstreamLimiter(rate=1, capacity=1, overrides={"store.steampowered.com": (1, 2)})
+    assert limiter.available("store.steampowered.com")
+    asyncio.run(limiter.acquire("other"))
+    assert not limiter.available("other")
+    assert limiter.available("store.steampowered.com")
+
+
+def test_keyed_limiter_refund_restores_token():
+    limiter = KeyedRateLimiter(rate=0.01, capacity=1)
+    assert limiter.try_acquire("alice") == 0.0
+    limiter.refund("alice")
+    assert limiter.try_acquire("alice") == 0.0
+    limiter.refund("nobody")
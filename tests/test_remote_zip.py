@@ -0,0 +1,181 @@
+import asyncio
+import contextlib
+import io
+import os
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from http_client import HttpResponse
+from remote_zip import (INITIAL_TAIL_SIZE, TAIL_SIZE, MemberLocation, RemoteZipError, SparseFile, open_remote_zip,
+                        read_member)
+
+
+class RangeClient:
+    """Serves get_range() from an in-memory archive and records the ranges asked for."""
+
+    def __init__(self, data: bytes, honour_range: bool = True):
+        self.data = data
+        self.honour_range = honour_range
+        self.ranges = []
+        self.full_gets = 0
+
+    async def get(self, url, *, timeout, headers=None):
+        self.full_gets += 1
+        return HttpResponse(200, url, CIMultiDictProxy(CIMultiDict()), self.data)
+
+    async def get_range(self, url, start, end=None, *, timeout, headers=None):
+        self.ranges.append((start, end))
+        if not self.honour_range:
+            return HttpResponse(200, url, CIMultiDictProxy(CIMultiDict()), self.data)
+        if start < 0:
+            start = max(len(self.data) + start, 0)
+        end = len(self.data) - 1 if end is None else end
+        headers = CIMultiDict({"Content-Range": f"bytes {start}-{end}/{len(self.data)}"})
+        return HttpResponse(206, url, CIMultiDictProxy(headers), self.data[start:end + 1])
+
+
+def build_archive(comment: bytes = b"", members: int = 3) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zip_ref:
+        # Incompressible payload so the central directory sits well past TAIL_SIZE from the start
+        zip_ref.writestr("payload.bin", os.urandom(4 * TAIL_SIZE))
+        for n in range(members):
+            zip_ref.writestr(f"{n}.lua", f"addappid({n})")
+        zip_ref.comment = comment
+    return buffer.getvalue()
+
+
+def open_archive(client: RangeClient) -> zipfile.ZipFile:
+    return asyncio.run(open_remote_zip(client, "https://files.example/app.zip"))
+
+
+def test_lists_archive_from_small_tail():
+    client = RangeClient(build_archive())
+    zip_ref = open_archive(client)
+    assert zip_ref.namelist() == ["payload.bin", "0.lua", "1.lua", "2.lua"]
+    assert client.ranges == [(-INITIAL_TAIL_SIZE, None)]
+
+
+@pytest.mark.parametrize("comment_length", [1, 300, 0xFFFF])
+def test_lists_archive_with_comment(comment_length):
+    comment = b"c" * comment_length
+    client = RangeClient(build_archive(comment))
+    zip_ref = open_archive(client)
+    assert zip_ref.namelist() == ["payload.bin", "0.lua", "1.lua", "2.lua"]
+    assert zip_ref.comment == comment
+    assert (-TAIL_SIZE, None) in client.ranges
+    assert zip_ref.getinfo("1.lua").file_size == len("addappid(1)")
+
+
+def test_fetches_central_directory_outside_tail():
+    client = RangeClient(build_archive(members=400))
+    zip_ref = open_archive(client)
+    assert len(zip_ref.namelist()) == 401
+    assert len(client.ranges) == 2
+
+
+def test_falls_back_to_full_body_without_range_support():
+    client = RangeClient(build_archive(b"comment"), honour_range=False)
+    zip_ref = open_archive(client)
+    assert zip_ref.read("2.lua") == b"addappid(2)"
+
+
+def test_skips_range_attempt_when_probe_saw_no_range_support():
+    client = RangeClient(build_archive(), honour_range=False)
+    zip_ref = asyncio.run(open_remote_zip(client, "https://files.example/app.zip", ranges=False))
+    assert zip_ref.namelist() == ["payload.bin", "0.lua", "1.lua", "2.lua"]
+    assert client.ranges == []
+    assert client.full_gets == 1
+
+
+def test_sparse_file_refuses_unfetched_bytes():
+    sparse = SparseFile(100)
+    sparse.add(90, b"x" * 10)
+    sparse.seek(-10, io.SEEK_END)
+    assert sparse.read() == b"x" * 10
+    sparse.seek(10)
+    with pytest.raises(RemoteZipError):
+        sparse.read(5)
+
+
+class RecordingPool:
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, func, *args):
+        self.calls.append(func)
+        return func(*args)
+
+
+@pytest.mark.parametrize("honour_range", [True, False])
+def test_parses_archive_on_pool(honour_range):
+    pool = RecordingPool()
+    client = RangeClient(build_archive(), honour_range=honour_range)
+    zip_ref = asyncio.run(open_remote_zip(client, "https://files.example/app.zip", pool=pool))
+    assert "0.lua" in zip_ref.namelist()
+    assert pool.calls == [zipfile.ZipFile]
+
+
+class StreamClient:
+    """Serves stream() from an in-memory archive in small chunks, honouring (or ignoring) the Range header."""
+
+    def __init__(self, data: bytes, honour_range: bool = True, chunk_size: int = 1000):
+        self.data = data
+        self.honour_range = honour_range
+        self.chunk_size = chunk_size
+
+    @contextlib.asynccontextmanager
+    async def stream(self, url, *, timeout, headers=None):
+        start, _, end = headers["Range"].removeprefix("bytes=").partition("-")
+        body, status = (self.data[int(start):int(end) + 1], 206) if self.honour_range else (self.data, 200)
+
+        async def iter_chunked(size):
+            for offset in range(0, len(body), self.chunk_size):
+                yield body[offset:offset + self.chunk_size]
+
+        yield SimpleNamespace(status=status, content=SimpleNamespace(iter_chunked=iter_chunked))
+
+
+def local_members(compression: int) -> tuple[bytes, dict[str, MemberLocation]]:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as zip_ref:
+        zip_ref.writestr("payload.bin", os.urandom(3 * TAIL_SIZE))
+        zip_ref.writestr("game.lua", "addappid(730)\n" * 5000)
+    data = buffer.getvalue()
+    with zipfile.ZipFile(io.BytesIO(data)) as zip_ref:
+        return data, {info.filename: MemberLocation.from_zipinfo(info) for info in zip_ref.infolist()}
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+@pytest.mark.parametrize("honour_range", [True, False])
+def test_reads_member_from_local_archive(compression, honour_range):
+    data, members = local_members(compression)
+    client = StreamClient(data, honour_range=honour_range)
+    member = asyncio.run(read_member(client, "https://files.example/app.zip", members["game.lua"], len(data)))
+    assert member.getvalue() == b"addappid(730)\n" * 5000
+
+
+def test_read_member_inflates_on_pool():
+    data, members = local_members(zipfile.ZIP_DEFLATED)
+    pool = RecordingPool()
+    asyncio.run(read_member(StreamClient(data), "https://files.example/app.zip", members["game.lua"], pool=pool))
+    assert pool.calls
+
+
+def test_read_member_rejects_corrupt_data():
+    data, members = local_members(zipfile.ZIP_STORED)
+    location = members["game.lua"]
+    corrupt = bytearray(data)
+    corrupt[location.header_offset + 30 + len(location.name) + location.extra_length] ^= 0xFF
+    with pytest.raises(zipfile.BadZipFile, match="CRC"):
+        asyncio.run(read_member(StreamClient(bytes(corrupt)), "https://files.example/app.zip", location))
+
+
+def test_read_member_refuses_members_over_the_limit():
+    data, members = local_members(zipfile.ZIP_STORED)
+    with pytest.raises(RemoteZipError):
+        asyncio.run(read_member(StreamClient(data), "https://files.example/app.zip", members["game.lua"],
+                                max_size=100))
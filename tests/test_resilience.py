@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from http_client import HttpClient
+from ratelimit import UpstreamLimiter
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, CircuitOpenError, hedged
+
+
+def test_breaker_opens_after_threshold_and_half_opens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    now[0] += 31
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one trial call at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+
+def test_breakers_fail_fast_per_host():
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=60)
+    breakers.record("steam", ok=False)
+    with pytest.raises(CircuitOpenError):
+        breakers.before("steam")
+    breakers.before("morrenus")
+    assert breakers.is_open("steam") and not breakers.is_open("morrenus")
+
+
+def test_hedged_races_a_second_call():
+    calls = []
+
+    async def slow_then_fast():
+        calls.append(len(calls))
+        await asyncio.sleep(1 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    started = time.perf_counter()
+    assert asyncio.run(hedged(slow_then_fast, 0.05)) == 2
+    assert time.perf_counter() - started < 0.5
+
+
+def test_hedged_skips_hedge_when_not_allowed():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "first"
+
+    assert asyncio.run(hedged(call, 0.02, allow=lambda: False)) == "first"
+    assert len(calls) == 1
+
+
+class StubClient(HttpClient):
+    def __init__(self, latency: float, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.sent = 0
+
+    async def _send(self, method, url, host, **kwargs):
+        self.sent += 1
+        await asyncio.sleep(self.latency)
+        return self.sent
+
+
+def test_get_hedged_does_not_count_queue_time():
+    async def scenario():
+        limiter = UpstreamLimiter(rate=5, capacity=1)
+        client = StubClient(latency=0.05, limiter=limiter)
+        # Each request queues ~0.2s behind the previous one, longer than the hedge delay
+        results = await asyncio.gather(*(client.get_hedged("https://store.example/x", delay=0.1, timeout=5)
+                                         for _ in range(3)))
+        return client.sent, results, limiter.stats()['queued']
+
+    sent, results, queued = asyncio.run(scenario())
+    assert sent == 3
+    assert queued == 0
+
+
+def test_get_hedged_hedges_slow_request_when_token_is_free():
+    async def scenario():
+        client = StubClient(latency=0.3, limiter=UpstreamLimiter(rate=100, capacity=5))
+        await client.get_hedged("https://store.example/x", delay=0.05, timeout=5)
+        return client.sent
+
+    assert asyncio.run(scenario()) == 2
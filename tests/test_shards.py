@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import core
+from cache import TTLCache
+from prefetch import Prefetcher
+from shared_cache import SharedCache
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedCache(str(tmp_path / "shared.sqlite3"))
+    yield store
+    store.close()
+
+
+def run(coro):
+    return core.bot.loop.run_until_complete(coro)
+
+
+def test_stale_peek_takes_another_processes_refresh(store, monkeypatch):
+    local = TTLCache(ttl=60, stale_ttl=600, shared=store, namespace="steam")
+    local.set("730", {'name': "old"}, ttl=-1)
+    # Another process refreshed the entry meanwhile
+    TTLCache(ttl=60, shared=store, namespace="steam").set("730", {'name': "new"})
+    store.flush()
+
+    async def upstream():
+        raise AssertionError("went upstream although the shared store was fresh")
+
+    async def scenario():
+        value, refresh = core.peek(local, core.RequestCoalescer(), "730", upstream)
+        return value, await refresh
+
+    assert run(scenario()) == ({'name': "old"}, {'name': "new"})
+
+
+def test_stale_peek_goes_upstream_when_shared_copy_is_stale_too(store):
+    local = TTLCache(ttl=60, stale_ttl=600, shared=store, namespace="steam")
+    local.set("730", {'name': "old"}, ttl=-1)
+    store.flush()
+
+    async def upstream():
+        return {'name': "fetched"}
+
+    async def scenario():
+        _, refresh = core.peek(local, core.RequestCoalescer(), "730", upstream)
+        return await refresh
+
+    assert run(scenario()) == {'name': "fetched"}
+
+
+def test_primary_prefetcher_merges_published_histories(store):
+    follower = Prefetcher(None, store=store, name="shards-1")
+    for app_id in ["50", "50", "60"]:
+        follower.record(app_id)
+    asyncio.run(follower.publish())
+    store.flush()
+
+    primary = Prefetcher(None, store=store, hot_size=3)
+    primary.record("70")
+    asyncio.run(primary.collect())
+    assert primary.hot_set()[0] == "50"
+    assert set(primary.hot_set()) == {"50", "60", "70"}
+
+
+def test_follower_builds_app_list_from_primary_body(store, monkeypatch):
+    body = json.dumps({'applist': {'apps': [{'appid': 730, 'name': "Counter-Strike 2"}]}})
+    store.set("app_list", "steam", body, 60)
+    store.flush()
+    monkeypatch.setattr(core, "shared_cache", store)
+    monkeypatch.setattr(core, "PRIMARY_PROCESS", False)
+
+    async def no_upstream(*args, **kwargs):
+        raise AssertionError("follower fetched the app list itself")
+
+    monkeypatch.setattr(core.http, "get", no_upstream)
+    started = time.perf_counter()
+    assert run(core.fetch_steam_app_list()) == [(730, "Counter-Strike 2")]
+    assert time.perf_counter() - started < 1
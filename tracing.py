@@ -0,0 +1,161 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import time
+from collections import deque
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# The command trace the running task belongs to; tasks started by gather() inherit it
+current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts for Prometheus plus a window of recent samples for percentiles."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            **{f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES},
+        }
+
+
+class Trace:
+    """Stage timings of one command invocation."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started = time.perf_counter()
+        self.spans: list[tuple[str, float]] = []
+
+    @contextlib.contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((stage, time.perf_counter() - start))
+
+    def breakdown(self) -> str:
+        # Repeated stages (a bulk lookup, several HTTP calls to one host) collapse into max and count
+        stages: dict[str, list] = {}
+        for stage, seconds in self.spans:
+            entry = stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] = max(entry[1], seconds)
+        return " ".join(f"{stage}={longest:.3f}s" if calls == 1 else f"{stage}={longest:.3f}s(max of {calls})"
+                        for stage, (calls, longest) in stages.items())
+
+
+class Tracer:
+    """Latency histograms per (command, stage) and per upstream host, plus a slow-command log."""
+
+    def __init__(self, slow_threshold: float = 5.0):
+        self.slow_threshold = slow_threshold
+        self.slow = 0
+        self.commands: dict[tuple[str, str], LatencyHistogram] = {}
+        self.upstreams: dict[str, LatencyHistogram] = {}
+
+    @staticmethod
+    def _histogram(table: dict, key) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = LatencyHistogram()
+        return histogram
+
+    @contextlib.contextmanager
+    def command(self, name: str):
+        trace = Trace(name)
+        token = current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            current_trace.reset(token)
+            self._finish(trace)
+
+    def _finish(self, trace: Trace):
+        total = time.perf_counter() - trace.started
+        for stage, seconds in trace.spans:
+            if not stage.startswith("http:"):
+                self._histogram(self.commands, (trace.command, stage)).observe(seconds)
+        self._histogram(self.commands, (trace.command, "total")).observe(total)
+        if total >= self.slow_threshold:
+            self.slow += 1
+            print(f"Slow /{trace.command}: {total:.3f}s {trace.breakdown()}")
+
+    def observe_upstream(self, host: str, seconds: float):
+        self._histogram(self.upstreams, host).observe(seconds)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.spans.append((f"http:{host}", seconds))
+
+    def render_prometheus(self, namespace: str) -> list[str]:
+        lines = []
+        for family, table, label_names in (
+            ("command_duration_seconds", self.commands, ("command", "stage")),
+            ("upstream_duration_seconds", self.upstreams, ("host",)),
+        ):
+            name = f"{namespace}_{family}"
+            lines.append(f"# TYPE {name} histogram")
+            quantile_lines = [f"# TYPE {name}_quantile gauge"]
+            for key, histogram in sorted(table.items()):
+                values = key if isinstance(key, tuple) else (key,)
+                labels = ",".join(f'{label}="{value}"' for label, value in zip(label_names, values))
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+                for q in QUANTILES:
+                    quantile_lines.append(f'{name}_quantile{{{labels},quantile="{q}"}} {histogram.quantile(q)}')
+            lines.extend(quantile_lines)
+        return lines
+
+    def stats(self) -> dict:
+        return {'commands': len({command for command, _ in self.commands}), 'slow': self.slow}
+
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Time a stage of the current command; a no-op outside one (prefetch, refreshers)."""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(stage):
+        yield
+
+
+def traced(stage: str):
+    """Decorator timing every call of an async helper as ``stage`` of the current command."""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
@@ -0,0 +1,67 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def default_workers() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+class WorkerPool:
+    """Bounded thread pool for CPU-bound work the event loop should not run itself.
+
+    zlib and sqlite release the GIL, so inflating several archives really
+    does use several cores. At most ``max_workers`` jobs run at once; callers
+    beyond that wait on a semaphore, where they can still be cancelled
+    without ever starting. A job that has already started runs to completion
+    (its slot is held until then), so long jobs should be submitted in pieces,
+    which is what the chunked ZIP inflation does.
+    """
+
+    def __init__(self, max_workers: int | None = None, name: str = "worker"):
+        self.max_workers = max_workers or default_workers()
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    async def run(self, func, *args, **kwargs):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+        def release(_):
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+        future.add_done_callback(release)
+        try:
+            # Shielded so a cancelled caller does not free the slot while the thread is still busy
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            'max_workers': self.max_workers,
+            'waiting': self.waiting,
+            'running': self.running,
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+        }